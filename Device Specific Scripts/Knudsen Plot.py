@@ -1,6 +1,5 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.stats import linregress
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog, simpledialog
@@ -28,7 +27,8 @@ def process_csv(file_path):
     # Calculate K for each data point
     data['K'] = calculate_K(data['slope'], data['pm'])
 
-    # Perform linear regression
+    # Perform linear regression (scipy is only loaded once a file has been picked)
+    from scipy.stats import linregress
     slope, intercept, r_value, p_value, std_err = linregress((data['pm'] ), data['K'])
 
     # Calculate the slip coefficient
@@ -1,67 +1,163 @@
+import importlib.util
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+OUTPUT_FOLDER = "extracted_data"
+# Combined datasets hold many runs, so they are kept out of the per-run folder that the Knudsen fits read
+COMBINED_FOLDER = "combined_data"
+OUTPUT_FORMATS = ("parquet", "feather", "csv")
 
 def convert_to_pascal(value):
     return (value - 1) * 4 * 100000  # Conversion formula from bar to Pascal
 
-def process_folder(folder_path):
-    # Iterate over each subfolder in the main folder
+def read_pressure_log(file_path, datetime_format=None):
+    """Read Date/Time and the two pressure channels of one logger CSV, converted to Pa."""
+    # Read the header once, then parse only the three needed columns (skipping the first 7 rows)
+    header = pd.read_csv(file_path, skiprows=7, nrows=0).columns
+    channel_0_col = header[2]  # Assuming the column is at index 2
+    channel_1_col = header[3]  # Assuming the column is at index 3
+    df = pd.read_csv(file_path, skiprows=7, usecols=['Date/Time', channel_0_col, channel_1_col], engine='c')
+    
+    # Convert 'Date/Time' column to datetime objects with one explicit format (guessed from the first row)
+    if datetime_format is None:
+        datetime_format = guess_datetime_format(str(df['Date/Time'].iloc[0]))
+    timestamps = pd.to_datetime(df['Date/Time'], format=datetime_format)
+    
+    # Build the output table directly instead of assigning into a slice of df
+    return pd.DataFrame({
+        channel_0_col: df[channel_0_col],
+        channel_1_col: df[channel_1_col],
+        # Calculate time difference in seconds from the first timestamp
+        'Time(seconds)': (timestamps - timestamps.iloc[0]).dt.total_seconds(),
+        'CHANNEL0_Pa': convert_to_pascal(df[channel_0_col]),
+        'CHANNEL1_Pa': convert_to_pascal(df[channel_1_col]),
+    })
+
+def engine_available(output_format):
+    """True if pandas can write output_format here (Parquet needs pyarrow or fastparquet, Feather pyarrow)."""
+    engines = {"parquet": ("pyarrow", "fastparquet"), "feather": ("pyarrow",)}.get(output_format, ())
+    return not engines or any(importlib.util.find_spec(engine) is not None for engine in engines)
+
+def write_table(data, output_path):
+    if output_path.endswith('.parquet'):
+        data.to_parquet(output_path, index=False)
+    elif output_path.endswith('.feather'):
+        data.reset_index(drop=True).to_feather(output_path)
+    else:
+        data.to_csv(output_path, index=False)
+
+def is_up_to_date(output_path, input_paths):
+    """True if output_path exists and is newer than every input file."""
+    if not os.path.exists(output_path):
+        return False
+    output_mtime = os.path.getmtime(output_path)
+    return all(os.path.getmtime(path) <= output_mtime for path in input_paths)
+
+def find_measurement_folders(folder_path):
+    """Every subfolder below folder_path with its CSV files (output folders excluded)."""
+    folders = []
     for root, dirs, files in os.walk(folder_path):
+        dirs[:] = [dir_name for dir_name in dirs if dir_name not in (OUTPUT_FOLDER, COMBINED_FOLDER)]
         for dir_name in dirs:
-            folder_path = os.path.join(root, dir_name)
-            
-            # Output folder to save the extracted CSV files for this subfolder
-            output_folder = os.path.join(folder_path, "extracted_data")
-            
-            # Create the output folder if it doesn't exist
-            if not os.path.exists(output_folder):
-                os.makedirs(output_folder)
-            
-            # Iterate over each file in the subfolder
-            for filename in os.listdir(folder_path):
-                if filename.endswith('.csv'):
-                    file_path = os.path.join(folder_path, filename)
-                    
-                    try:
-                        # Read the CSV file, skipping the first 7 rows
-                        df = pd.read_csv(file_path, skiprows=7)
-                        
-                        # Convert 'Date/Time' column to datetime objects
-                        df['Date/Time'] = pd.to_datetime(df['Date/Time'])
-                        
-                        # Calculate time difference in seconds from the first timestamp
-                        first_timestamp = df['Date/Time'].iloc[0]
-                        df['Time(seconds)'] = (df['Date/Time'] - first_timestamp).dt.total_seconds()
-                        
-                        # Update column names according to the actual names in the DataFrame
-                        channel_0_col = df.columns[2]  # Assuming the column is at index 2
-                        channel_1_col = df.columns[3]  # Assuming the column is at index 3
-                        
-                        # Extract columns and convert to Pascal
-                        extracted_data = df[[channel_0_col, channel_1_col, 'Time(seconds)']]
-                        extracted_data['CHANNEL0_Pa'] = convert_to_pascal(extracted_data[channel_0_col])
-                        extracted_data['CHANNEL1_Pa'] = convert_to_pascal(extracted_data[channel_1_col])
-                        
-                        # Save the extracted data to a new CSV file in the output folder
-                        extracted_file_path = os.path.join(output_folder, f'extracted_data_{filename}')
-                        extracted_data.to_csv(extracted_file_path, index=False)
-                        print(f"Processed: {filename}")
-                    except Exception as e:
-                        print(f"Error processing {filename}: {e}")
+            subfolder = os.path.join(root, dir_name)
+            csv_files = sorted(name for name in os.listdir(subfolder) if name.endswith('.csv'))
+            if csv_files:
+                folders.append((subfolder, csv_files))
+    return folders
+
+def convert_file(job):
+    # Worker entry point: report errors instead of raising, so one bad file does not stop the batch
+    file_path, output_path = job
+    try:
+        data = read_pressure_log(file_path)
+        if output_path is None:
+            return file_path, data, None
+        write_table(data, output_path)
+        return file_path, None, None
+    except Exception as e:
+        return file_path, None, str(e)
+
+def process_folder(folder_path, output_format="parquet", combine=False, workers=None):
+    """Extract every subfolder's CSVs on a process pool, skipping outputs that are already newer.
+
+    Each CSV becomes extracted_data/extracted_data_<name>.<format>, or with combine=True each
+    subfolder becomes one combined_data/<subfolder>.<format> dataset with a source_file column.
+    Without a Parquet/Feather engine the files are written as CSV instead.
+    """
+    # Check once here instead of letting every worker fail on its first write
+    if not engine_available(output_format):
+        print(f"No {output_format} engine installed (pip install pyarrow); writing CSV instead.")
+        output_format = "csv"
+    jobs = []
+    datasets = {}  # dataset path -> list of (file name, job index)
+    for subfolder, csv_files in find_measurement_folders(folder_path):
+        # Output folder to save the extracted files for this subfolder
+        output_folder = os.path.join(subfolder, COMBINED_FOLDER if combine else OUTPUT_FOLDER)
+        os.makedirs(output_folder, exist_ok=True)
+        input_paths = [os.path.join(subfolder, filename) for filename in csv_files]
+        
+        if combine:
+            dataset_path = os.path.join(output_folder, f"{os.path.basename(subfolder)}.{output_format}")
+            if is_up_to_date(dataset_path, input_paths):
+                print(f"Up to date: {dataset_path}")
+                continue
+            datasets[dataset_path] = [(filename, len(jobs) + i) for i, filename in enumerate(csv_files)]
+            jobs.extend((file_path, None) for file_path in input_paths)
+        else:
+            for filename, file_path in zip(csv_files, input_paths):
+                if output_format != "csv":
+                    filename = f"{os.path.splitext(filename)[0]}.{output_format}"
+                output_path = os.path.join(output_folder, f"extracted_data_{filename}")
+                if is_up_to_date(output_path, [file_path]):
+                    continue
+                jobs.append((file_path, output_path))
+    
+    results = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(convert_file, jobs, chunksize=max(1, len(jobs) // (4 * (os.cpu_count() or 1)))))
+    for file_path, _, error in results:
+        if error is None:
+            print(f"Processed: {os.path.basename(file_path)}")
+        else:
+            print(f"Error processing {os.path.basename(file_path)}: {error}")
+    
+    for dataset_path, members in datasets.items():
+        tables = [results[index][1].assign(source_file=filename) for filename, index in members
+                  if results[index][1] is not None]
+        if tables:
+            write_table(pd.concat(tables, ignore_index=True), dataset_path)
+            print(f"Saved dataset: {dataset_path}")
+    print(f"{len(jobs)} files extracted, the rest were up to date.")
 
 def select_folder():
     folder_path = filedialog.askdirectory()
     if folder_path:
-        process_folder(folder_path)
-
-# Create a Tkinter window
-root = tk.Tk()
-root.title("Select Folder")
-
-# Button to select folder
-button = tk.Button(root, text="Select Folder", command=select_folder)
-button.pack()
+        process_folder(folder_path, format_var.get(), combine_var.get())
 
-root.mainloop()
+if __name__ == "__main__":
+    # Create a Tkinter window
+    root = tk.Tk()
+    root.title("Select Folder")
+    
+    # Output format and layout
+    format_var = tk.StringVar(value="parquet" if engine_available("parquet") else "csv")
+    combine_var = tk.BooleanVar(value=False)
+    format_frame = tk.Frame(root)
+    for output_format in OUTPUT_FORMATS:
+        tk.Radiobutton(format_frame, text=output_format.capitalize(), variable=format_var, value=output_format).pack(side=tk.LEFT)
+    format_frame.pack()
+    tk.Checkbutton(root, text="One dataset per subfolder", variable=combine_var).pack()
+    
+    # Button to select folder
+    button = tk.Button(root, text="Select Folder", command=select_folder)
+    button.pack()
+    
+    root.mainloop()
@@ -0,0 +1,155 @@
+"""Incremental, parallel extraction of instrument reports.
+
+The device scripts (Accupyc, Geopycc, Trios) pass their per-file extract
+function to run_extraction(). A JSON manifest remembers every processed file
+(path, mtime, size, SHA-256) together with the rows extracted from it, so a
+re-run only parses new or changed reports and reuses the stored rows for the
+rest. Results are written in one go with write_table() as CSV or Parquet,
+and can be added to the shared results index (see results_index.py).
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+MANIFEST_VERSION = 1
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Processed files and the rows extracted from them, stored as JSON.
+
+    A file counts as unchanged when its mtime and size match the manifest. If
+    only the mtime changed (a copy or touch), the hash decides, so reports
+    re-copied to the share are not parsed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False  # Set whenever entries differ from the file
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                stored = json.load(file)
+            if stored.get('version') == MANIFEST_VERSION:
+                self.entries = stored['files']
+
+    def lookup(self, file_path, stat):
+        """Stored rows of an unchanged file, or None if it has to be parsed."""
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None or entry['size'] != stat.st_size:
+            return None
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            if entry['sha256'] != file_hash(file_path):
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self.dirty = True
+        return entry['rows']
+
+    def update(self, file_path, stat, rows, sha256):
+        self.entries[os.path.abspath(file_path)] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': sha256,
+            'rows': rows,
+        }
+        self.dirty = True
+
+    def prune(self, file_paths):
+        """Forget files that no longer exist in the sweep."""
+        keep = {os.path.abspath(path) for path in file_paths}
+        entries = {path: entry for path, entry in self.entries.items() if path in keep}
+        if len(entries) != len(self.entries):
+            self.entries = entries
+            self.dirty = True
+
+    def save(self):
+        # Write to a temporary file first so an interrupted run never leaves a broken manifest
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.entries}, file)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+def find_reports(folder_path, suffix='.txt', recursive=False):
+    """Sorted report files in a folder (and its subfolders if recursive)."""
+    if recursive:
+        paths = (os.path.join(root, name) for root, _, names in os.walk(folder_path) for name in names)
+    else:
+        paths = (os.path.join(folder_path, name) for name in os.listdir(folder_path))
+    return sorted(path for path in paths if path.lower().endswith(suffix.lower()) and os.path.isfile(path))
+
+
+def _extract_job(job):
+    # Worker entry point: report errors instead of raising, so one bad report does not stop the sweep
+    extract, file_path = job
+    try:
+        return file_path, extract(file_path), file_hash(file_path), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+
+def run_extraction(file_paths, extract, manifest_path, workers=None, use_processes=False, needs_update=None,
+                   ingest=None):
+    """Extract rows from new or changed files and reuse the manifest for the rest.
+
+    extract(file_path) must return a list of JSON-serializable row dicts (an
+    empty list if the file holds no data). With use_processes=True it has to
+    be a module-level function. needs_update(file_path) can force files to be
+    parsed again, e.g. when their output file was deleted. ingest(rows_by_file,
+    parsed) receives the rows of every file and the files parsed in this run,
+    e.g. ResultsIndex.ingest to keep the results index up to date. Returns all
+    rows in file order and the list of files that were actually parsed.
+    """
+    manifest = Manifest(manifest_path)
+    manifest.prune(file_paths)
+
+    rows_by_file = {}
+    stats = {}
+    pending = []
+    for file_path in file_paths:
+        stats[file_path] = os.stat(file_path)
+        rows = manifest.lookup(file_path, stats[file_path])
+        if rows is None or (needs_update is not None and needs_update(file_path)):
+            pending.append(file_path)
+        else:
+            rows_by_file[file_path] = rows
+
+    if pending:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            for file_path, rows, sha256, error in executor.map(_extract_job, [(extract, path) for path in pending]):
+                if error is not None:
+                    print(f"Error processing {file_path}: {error}")
+                    continue
+                rows_by_file[file_path] = rows
+                manifest.update(file_path, stats[file_path], rows, sha256)
+    if manifest.dirty:
+        manifest.save()
+
+    if ingest is not None:
+        ingest(rows_by_file, pending)
+
+    all_rows = [row for file_path in file_paths for row in rows_by_file.get(file_path, [])]
+    return all_rows, pending
+
+
+def write_table(rows, output_file, columns):
+    """Write rows in one go; the extension of output_file picks CSV or Parquet."""
+    table = pd.DataFrame(rows, columns=columns)
+    if output_file.lower().endswith('.parquet'):
+        table.to_parquet(output_file, index=False)
+    else:
+        table.to_csv(output_file, index=False)
+    return table
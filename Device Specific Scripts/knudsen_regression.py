@@ -0,0 +1,235 @@
+"""Slope extraction for Knudsen permeability measurements.
+
+Every pressure-rise CSV (Time(seconds), CHANNEL0_Pa, CHANNEL1_Pa) is smoothed
+once, its linear region is detected by scoring all candidate windows at once,
+and the slope of the raw CHANNEL1 signal over that region is fitted. The table
+has the same columns as the one saved by "linear regression Knudsen.py", so
+"Knudsen Plot.py" can read it directly.
+
+Run headless over one folder per sample; each folder gives <sample>.csv:
+
+    python knudsen_regression.py sample_A sample_B --out slopes
+"""
+import argparse
+import functools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Define constants for permeability coefficient calculation
+V = 1.97E-03  # m^3, vessel volume
+L = 2.50E-02  # m, sample length
+A = 1.33E-04  # m^2, sample cross-sectional area
+P_ATMOSPHERE = 100000  # Pa, pressure on the outlet side
+
+TIME = 'Time(seconds)'
+P_OUT = 'CHANNEL1_Pa'  # Rising pressure that is fitted
+P_IN = 'CHANNEL0_Pa'  # Feed pressure, averaged over the fitted window
+
+MEASUREMENT_EXTENSIONS = ('.csv', '.parquet', '.feather')  # Outputs of "extract data.py"
+
+RESULT_COLUMNS = ['filename', 'slope', 'intercept', 'r_value', 'average_pressure_p0',
+                  'permeability_coefficient', 'pm']
+
+
+def smooth_data(data, window_length=31, polyorder=10):
+    from scipy.signal import savgol_filter
+    return savgol_filter(data, window_length, polyorder)
+
+
+class WindowFits:
+    """Least-squares line fits of y over x for any number of index windows [start, stop).
+
+    The points of all windows are gathered into one flat array and every
+    window is centered on its own means before the sums of squares are taken,
+    so short windows of long series are fitted as exactly as a direct fit.
+    A batch costs time proportional to the total number of points in it.
+    """
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+
+    def fit(self, start, stop):
+        """Slope, intercept and R² of every window; NaN where the fit is undefined."""
+        scalar = np.ndim(start) == 0
+        start = np.atleast_1d(np.asarray(start, dtype=np.intp))
+        stop = np.atleast_1d(np.asarray(stop, dtype=np.intp))
+        counts = np.maximum(stop - start, 0)
+        window = np.repeat(np.arange(len(start)), counts)
+        index = start[window] + np.arange(len(window)) - np.repeat(np.cumsum(counts) - counts, counts)
+        x = self.x[index]
+        y = self.y[index]
+        n = counts.astype(np.float64)
+
+        def sums(values):
+            return np.bincount(window, weights=values, minlength=len(start))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_mean = sums(x) / n
+            y_mean = sums(y) / n
+            dx = x - x_mean[window]
+            dy = y - y_mean[window]
+            sxx = sums(dx * dx)
+            syy = sums(dy * dy)
+            sxy = sums(dx * dy)
+
+            valid = (n >= 2) & (sxx > 0)
+            slope = np.where(valid, sxy / sxx, np.nan)
+            intercept = y_mean - slope * x_mean
+            r_squared = np.minimum(np.where(valid & (syy > 0), sxy * sxy / (sxx * syy), np.nan), 1.0)
+        if scalar:
+            return slope[0], intercept[0], r_squared[0]
+        return slope, intercept, r_squared
+
+
+def linear_runs(smoothed_data, threshold=0.01):
+    """Start and stop indices of the stretches where the slope of the signal barely changes."""
+    slopes = np.gradient(smoothed_data)
+    flat = np.abs(np.diff(slopes)) < threshold
+
+    # Edges of runs of True in flat; flat[i] compares the slopes at i and i + 1
+    edges = np.diff(np.concatenate(([0], flat.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1) + 1
+    return starts, np.minimum(stops, len(smoothed_data))
+
+
+def detect_linear_region(smoothed_data, threshold=0.01, min_r_squared=0.9, min_points=10):
+    """Longest linear stretch of the signal with an R² of at least min_r_squared.
+
+    All candidate stretches are scored in one pass; returns (start, stop) indices,
+    or (None, None) if no stretch qualifies.
+    """
+    starts, stops = linear_runs(smoothed_data, threshold)
+    long_enough = stops - starts >= min_points
+    starts, stops = starts[long_enough], stops[long_enough]
+    if len(starts) == 0:
+        return None, None
+
+    _, _, r_squared = WindowFits(np.arange(len(smoothed_data)), smoothed_data).fit(starts, stops)
+    good = np.flatnonzero(r_squared >= min_r_squared)
+    if len(good) == 0:
+        return None, None
+    best = good[np.argmax(stops[good] - starts[good])]
+    return int(starts[best]), int(stops[best])
+
+
+def read_measurement(file_path):
+    """Time and pressure columns of one measurement (CSV, or Parquet/Feather from "extract data.py")."""
+    columns = [TIME, P_OUT, P_IN]
+    if file_path.endswith('.parquet'):
+        return pd.read_parquet(file_path, columns=columns)
+    if file_path.endswith('.feather'):
+        return pd.read_feather(file_path, columns=columns)
+    return pd.read_csv(file_path, usecols=columns)
+
+
+def permeability_coefficient(slope, average_pressure_p0):
+    return (slope / ((average_pressure_p0 + P_ATMOSPHERE) / 2)) * ((V * L) / A)
+
+
+class KnudsenRun:
+    """One pressure-rise measurement with cached smoothing and exact window fits."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        data = read_measurement(file_path)
+        self.time = data[TIME].to_numpy(dtype=np.float64)
+        self.pressure = data[P_OUT].to_numpy(dtype=np.float64)
+        self.feed_pressure = data[P_IN].to_numpy(dtype=np.float64)
+        self.fits = WindowFits(self.time, self.pressure)
+
+    @functools.cached_property
+    def smoothed(self):
+        """Smoothed CHANNEL1 signal, computed on first use and then kept."""
+        return smooth_data(self.pressure)
+
+    def time_window(self, x_min, x_max):
+        """Index window of the points with x_min <= time <= x_max."""
+        start = int(np.searchsorted(self.time, x_min, side='left'))
+        stop = int(np.searchsorted(self.time, x_max, side='right'))
+        return start, stop
+
+    def regression(self, start, stop):
+        """Slope, intercept, r_value and mean feed pressure of the raw data in [start, stop)."""
+        slope, intercept, r_squared = self.fits.fit(start, stop)
+        r_value = np.sign(slope) * np.sqrt(r_squared)
+        average_pressure_p0 = self.feed_pressure[start:stop].mean() if stop > start else np.nan
+        return float(slope), float(intercept), float(r_value), float(average_pressure_p0)
+
+    def result_row(self, start, stop):
+        slope, intercept, r_value, average_pressure_p0 = self.regression(start, stop)
+        return {
+            'filename': os.path.basename(self.file_path),
+            'slope': slope,
+            'intercept': intercept,
+            'r_value': r_value,
+            'average_pressure_p0': average_pressure_p0,
+            'permeability_coefficient': permeability_coefficient(slope, average_pressure_p0),
+            'pm': (average_pressure_p0 + P_ATMOSPHERE) / 2,
+        }
+
+
+def analyse_file(file_path, min_r_squared=0.9, threshold=0.01):
+    """Result row of one measurement, or None if no reliable linear region was found."""
+    run = KnudsenRun(file_path)
+    start, stop = detect_linear_region(run.smoothed, threshold, min_r_squared)
+    if start is None:
+        return None
+    row = run.result_row(start, stop)
+    if not row['r_value'] ** 2 >= min_r_squared:
+        return None
+    return row
+
+
+def _analyse_job(job):
+    # Worker entry point: report errors instead of raising, so one bad file does not stop the batch
+    file_path, min_r_squared, threshold = job
+    try:
+        return file_path, analyse_file(file_path, min_r_squared, threshold), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def slope_tables(folders, min_r_squared=0.9, threshold=0.01, workers=None):
+    """Slope table per folder, with all files of all folders fitted on one process pool."""
+    # Results are grouped by the folder each file was found in, exactly as the folder was given
+    found = [(folder, os.path.join(folder, name)) for folder in folders
+             for name in sorted(os.listdir(folder)) if name.endswith(MEASUREMENT_EXTENSIONS)]
+    jobs = [(file_path, min_r_squared, threshold) for _, file_path in found]
+    rows = {folder: [] for folder in folders}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for (folder, _), (file_path, row, error) in zip(found, executor.map(_analyse_job, jobs)):
+            if error is not None:
+                print(f"Error processing {file_path}: {error}")
+            elif row is None:
+                print(f"No reliable linear region in {file_path}")
+            else:
+                rows[folder].append(row)
+    return {folder: pd.DataFrame(folder_rows, columns=RESULT_COLUMNS) for folder, folder_rows in rows.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit pressure-rise slopes of Knudsen measurements without the GUI.")
+    parser.add_argument("folders", nargs="+", help="one folder of measurement files (CSV, Parquet or Feather) per sample")
+    parser.add_argument("--out", default="knudsen_slopes", help="output folder for the slope tables")
+    parser.add_argument("--min-r2", type=float, default=0.9, help="minimum R² of an accepted fit (default: 0.9)")
+    parser.add_argument("--threshold", type=float, default=0.01,
+                        help="largest change of the smoothed slope per point inside a linear region (default: 0.01)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    folders = [os.path.normpath(folder) for folder in args.folders]
+    os.makedirs(args.out, exist_ok=True)
+    for folder, table in slope_tables(folders, args.min_r2, args.threshold, args.workers).items():
+        output_file = os.path.join(args.out, f"{os.path.basename(folder)}.csv")
+        table.to_csv(output_file, index=False)
+        print(f"{len(table)} slopes saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
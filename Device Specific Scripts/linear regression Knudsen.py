@@ -2,40 +2,14 @@ import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import linregress
 from matplotlib.widgets import Slider, Button
 from tkinter import filedialog
 import tkinter as tk
-from scipy.signal import savgol_filter
+from knudsen_regression import KnudsenRun, MEASUREMENT_EXTENSIONS, RESULT_COLUMNS, detect_linear_region
 
-# Define constants for permeability coefficient calculation
-V = 1.97E-03  # m^3, vessel volume
-L = 2.50E-02  # m, sample length
-A = 1.33E-04  # m^2, sample cross-sectional area
-
-def smooth_data(data, window_length=31, polyorder=10):
-    return savgol_filter(data, window_length, polyorder)
-
-def detect_linear_region(smoothed_data, threshold=0.01, min_r_squared=0.9):
-    slopes = np.gradient(smoothed_data)
-    diff_slopes = np.abs(np.diff(slopes))
-    linear_region_indices = np.where(diff_slopes < threshold)[0]
-    
-    # Iterate through linear regions and calculate R-squared
-    for i in range(len(linear_region_indices) - 1):
-        start_index = linear_region_indices[i]
-        end_index = linear_region_indices[i + 1]
-        
-        # Perform linear regression on the subset of data
-        subset_data = smoothed_data[start_index:end_index]
-        x = np.arange(len(subset_data))
-        slope, intercept, r_value, _, _ = linregress(x, subset_data)
-        
-        # Check if R-squared meets the threshold
-        if r_value ** 2 >= min_r_squared:
-            return start_index, end_index
-            
-    return None, None
+# Fitting, smoothing and the permeability constants live in knudsen_regression.py,
+# which also runs headless over whole folders:
+#     python knudsen_regression.py sample_A sample_B --out slopes
 
 def update_plot(val):
     x_min = slider_min.val
@@ -43,24 +17,23 @@ def update_plot(val):
 
     ax.clear()
 
-    # Smooth the data
-    smoothed_pressure = smooth_data(extracted_data['CHANNEL1_Pa'])
-
     # Plot the original data
-    # ax.plot(extracted_data['Time(seconds)'], extracted_data['CHANNEL1_Pa'], label='Original Data')
+    # ax.plot(run.time, run.pressure, label='Original Data')
 
-    # Plot the smoothed data
-    ax.plot(extracted_data['Time(seconds)'], smoothed_pressure, label='Smoothed Data', color='green')
+    # Plot the smoothed data (smoothed once per file)
+    ax.plot(run.time, run.smoothed, label='Smoothed Data', color='green')
 
     # Perform linear regression on the original data within the specified range
-    subset_original_data = extracted_data[(extracted_data['Time(seconds)'] >= x_min) & (extracted_data['Time(seconds)'] <= x_max)]
-    slope, intercept, r_value, _, _ = linregress(subset_original_data['Time(seconds)'], subset_original_data['CHANNEL1_Pa'])
+    start, stop = run.time_window(x_min, x_max)
+    slope, intercept, r_value, average_pressure_p0 = run.regression(start, stop)
+    subset_time = run.time[start:stop]
+    subset_pressure = run.pressure[start:stop]
 
     # Plot the linear regression line
-    ax.plot(subset_original_data['Time(seconds)'], slope * subset_original_data['Time(seconds)'] + intercept, color='red', linestyle='--', label='Linear Regression')
+    ax.plot(subset_time, slope * subset_time + intercept, color='red', linestyle='--', label='Linear Regression')
 
     # Highlight the area under the regression line
-    ax.fill_between(subset_original_data['Time(seconds)'], subset_original_data['CHANNEL1_Pa'], slope * subset_original_data['Time(seconds)'] + intercept, color='lightblue')
+    ax.fill_between(subset_time, subset_pressure, slope * subset_time + intercept, color='lightblue')
 
     ax.set_xlabel('Time (seconds)')
     ax.set_ylabel('Pressure (Pa)')
@@ -69,26 +42,25 @@ def update_plot(val):
 
     plt.draw()
 
-    return slope, intercept, r_value, subset_original_data['CHANNEL0_Pa'].mean()
+    return slope, intercept, r_value, average_pressure_p0, start, stop
 
 def detect_linear_region_button(event):
     global start_index, end_index
-    smoothed_pressure = smooth_data(extracted_data['CHANNEL1_Pa'])
-    start_index, end_index = detect_linear_region(smoothed_pressure)
-    slider_min.set_val(extracted_data.iloc[start_index]['Time(seconds)'])
-    slider_max.set_val(extracted_data.iloc[end_index - 1]['Time(seconds)'])
+    start_index, end_index = detect_linear_region(run.smoothed)
+    if start_index is None:
+        print("No linear region found.")
+        return
+    slider_min.set_val(run.time[start_index])
+    slider_max.set_val(run.time[end_index - 1])
     update_plot(None)
 
 def save_regression_data(event):
-    slope, intercept, r_value, average_pressure_p0 = update_plot(None)
+    slope, intercept, r_value, average_pressure_p0, start, stop = update_plot(None)
     
     # Check if valid data is available
     if np.isnan(slope):
         print("No valid data available.")
         return
-
-    new_pm = (average_pressure_p0 + 100000) / 2
-    permeability_coefficient = (slope / ((average_pressure_p0 + 100000) / 2)) * ((V * L) / A)
     
     # Check if R^2 is less than 0.9
     if r_value ** 2 < 0.90:
@@ -101,10 +73,10 @@ def save_regression_data(event):
         return
     
     # Add the results to the linear_regression_results list
-    linear_regression_results.append({'filename': filename, 'slope': slope, 'intercept': intercept, 'r_value': r_value, 'average_pressure_p0': average_pressure_p0, 'permeability_coefficient': permeability_coefficient, 'pm': new_pm})
+    linear_regression_results.append(run.result_row(start, stop))
     
     # Convert the list to a DataFrame
-    df_results = pd.DataFrame(linear_regression_results)
+    df_results = pd.DataFrame(linear_regression_results, columns=RESULT_COLUMNS)
     
     # Save DataFrame to CSV file
     if output_file_path:
@@ -131,13 +103,9 @@ folder_path = filedialog.askdirectory(title="Select folder with input files")
 select_output_file()
 
 for filename in os.listdir(folder_path):
-    if filename.endswith('.csv'):
+    if filename.endswith(MEASUREMENT_EXTENSIONS):
         file_path = os.path.join(folder_path, filename)
-        df = pd.read_csv(file_path)
-        
-        channel_0_col = df.columns[0]  # Assuming the column is at index 0
-        channel_1_col = df.columns[1]  # Assuming the column is at index 1
-        extracted_data = df[['Time(seconds)', 'CHANNEL1_Pa', 'CHANNEL0_Pa']]
+        run = KnudsenRun(file_path)
 
         fig, ax = plt.subplots()
         plt.subplots_adjust(bottom=0.4)
@@ -147,8 +115,8 @@ for filename in os.listdir(folder_path):
         ax_slider_min = plt.axes([0.25, 0.15, 0.65, 0.03], facecolor=axcolor)
         ax_slider_max = plt.axes([0.25, 0.1, 0.65, 0.03], facecolor=axcolor)
 
-        slider_min = Slider(ax_slider_min, 'X Min', 0, extracted_data['Time(seconds)'].max(), valinit=0)
-        slider_max = Slider(ax_slider_max, 'X Max', 0, extracted_data['Time(seconds)'].max(), valinit=extracted_data['Time(seconds)'].max())
+        slider_min = Slider(ax_slider_min, 'X Min', 0, run.time.max(), valinit=0)
+        slider_max = Slider(ax_slider_max, 'X Max', 0, run.time.max(), valinit=run.time.max())
 
         slider_min.on_changed(update_plot)
         slider_max.on_changed(update_plot)
@@ -0,0 +1,161 @@
+"""Persistent SQLite index of porosity and density results across campaigns.
+
+The extraction scripts (Accupyc, Geopycc) hand every report they extract to
+ResultsIndex.ingest() through run_extraction(). Each measurement is stored
+once with its sample ID, the sample number used for sorting and the campaign
+(the report folder), both parsed at ingest. Plots then read grouped
+statistics from the index instead of re-reading the raw reports or CSVs.
+The index file lives next to the extraction output (see index_path_for()).
+"""
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+INDEX_NAME = 'results_index.sqlite'
+SAMPLE_NUMBER_PATTERN = re.compile(r'\d+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    quantity TEXT NOT NULL,
+    sample TEXT NOT NULL,
+    sample_number REAL,
+    campaign TEXT,
+    source TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measurements_by_sample ON measurements (quantity, sample);
+CREATE INDEX IF NOT EXISTS measurements_by_source ON measurements (source, quantity);
+"""
+
+
+def index_path_for(output_file):
+    """Index file in the folder of an extraction output, wherever the script is run from."""
+    return os.path.join(os.path.dirname(os.path.abspath(output_file)), INDEX_NAME)
+
+
+def sample_id(file_path):
+    """Sample ID of a report: its file name without extension."""
+    return os.path.splitext(os.path.basename(file_path))[0].strip()
+
+
+def sample_number(sample):
+    """First number in a sample ID (the composition the plots sort by), or None."""
+    match = SAMPLE_NUMBER_PATTERN.search(sample)
+    return float(match.group(0)) if match else None
+
+
+def group_stats(measurements, min_value=None):
+    """Mean, sample standard deviation and count of value per sample, ordered by sample number.
+
+    measurements is a table with sample, sample_number and value columns.
+    Values below min_value are left out before grouping.
+    """
+    if min_value is not None:
+        measurements = measurements[measurements["value"] >= min_value]
+    stats = measurements.groupby("sample", sort=False).agg(
+        sample_number=("sample_number", "first"),
+        mean=("value", "mean"),
+        std=("value", "std"),
+        count=("value", "size"),
+    )
+    return stats.sort_values(["sample_number"], kind="stable", na_position="last").reset_index()
+
+
+def _numbers(values):
+    numbers = []
+    for value in values:
+        try:
+            numbers.append(float(value))
+        except (TypeError, ValueError):
+            continue
+    return numbers
+
+
+class ResultsIndex:
+    """SQLite file of (quantity, sample, sample_number, campaign, source, value) measurements.
+
+    Rows are replaced per report: re-ingesting a changed report drops its old
+    values first, so the index never holds duplicates of one file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def sources(self, quantity):
+        """Reports that already have rows of quantity in the index."""
+        cursor = self.connection.execute("SELECT DISTINCT source FROM measurements WHERE quantity = ?", (quantity,))
+        return {source for (source,) in cursor}
+
+    def replace(self, quantity, file_path, values):
+        """Store the values of one report, replacing whatever the index held for it."""
+        with self.connection:
+            self._replace(quantity, file_path, values)
+
+    def _replace(self, quantity, file_path, values):
+        source = os.path.abspath(file_path)
+        sample = sample_id(file_path)
+        campaign = os.path.basename(os.path.dirname(source))
+        self.connection.execute("DELETE FROM measurements WHERE source = ? AND quantity = ?", (source, quantity))
+        self.connection.executemany("INSERT INTO measurements VALUES (?, ?, ?, ?, ?, ?)",
+                                    [(quantity, sample, sample_number(sample), campaign, source, value)
+                                     for value in values])
+
+    def ingest(self, quantity, value_column, folder, rows_by_file, parsed):
+        """run_extraction() hook: store the rows of parsed reports and of reports not indexed yet.
+
+        Reports the manifest skipped as unchanged are only written when the
+        index does not know them, e.g. on the first run with an existing
+        manifest. Rows of reports that were in the swept folder but no longer
+        exist are deleted. Values that are not numbers are left out. All
+        reports are written in one transaction.
+        """
+        parsed = set(parsed)
+        known = self.sources(quantity)
+        folder = os.path.abspath(folder)
+        removed = [(source, quantity) for source in known
+                   if os.path.dirname(source) == folder and not os.path.exists(source)]
+        with self.connection:
+            self.connection.executemany("DELETE FROM measurements WHERE source = ? AND quantity = ?", removed)
+            for file_path, rows in rows_by_file.items():
+                if file_path in parsed or os.path.abspath(file_path) not in known:
+                    self._replace(quantity, file_path, _numbers(row[value_column] for row in rows))
+
+    def measurements(self, quantity, campaigns=None, columns=("sample", "sample_number", "campaign", "source", "value")):
+        """Measurements of quantity (optionally of some campaigns only) as a DataFrame."""
+        query = f"SELECT {', '.join(columns)} FROM measurements WHERE quantity = ?"
+        params = [quantity]
+        if campaigns:
+            query += f" AND campaign IN ({', '.join('?' * len(campaigns))})"
+            params.extend(campaigns)
+        return pd.read_sql_query(query, self.connection, params=params)
+
+    def group_stats(self, quantity, campaigns=None, min_value=None):
+        """Per-sample mean, std and count of quantity; see group_stats()."""
+        return group_stats(self.measurements(quantity, campaigns, ("sample", "sample_number", "value")), min_value)
+
+
+def read_table_measurements(table_path, sample_column, value_column):
+    """Measurements from an extraction CSV/Parquet, for plots run before the index existed."""
+    if table_path.lower().endswith('.parquet'):
+        table = pd.read_parquet(table_path)
+    else:
+        table = pd.read_csv(table_path)
+    samples = table[sample_column].astype(str).str.strip()
+    numbers = samples.str.extract(f"({SAMPLE_NUMBER_PATTERN.pattern})", expand=False).astype(np.float64)
+    return pd.DataFrame({"sample": samples, "sample_number": numbers,
+                         "value": pd.to_numeric(table[value_column], errors="coerce")}).dropna(subset=["value"])
@@ -1,10 +1,18 @@
+import os
+import shutil
+import subprocess
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import tkinter as tk
-from tkinter import filedialog, ttk
+from tkinter import filedialog, messagebox, ttk
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.animation import PillowWriter
+from matplotlib.figure import Figure
+from PIL import Image
+
+EXPORT_FPS = 144
 
 class PulsePlotter:
     def __init__(self, root):
@@ -57,7 +65,7 @@ class PulsePlotter:
         self.points_per_frame_entry.grid(row=5, column=1)
 
         # Button to save animation
-        self.btn_save = tk.Button(root, text="Save as GIF", command=self.save_animation, state=tk.DISABLED)
+        self.btn_save = tk.Button(root, text="Save as GIF/MP4", command=self.save_animation, state=tk.DISABLED)
         self.btn_save.pack(pady=10)
 
         # Progress bar and label
@@ -102,6 +110,8 @@ class PulsePlotter:
 
         # Convert to DataFrame
         self.df = pd.DataFrame(pulse_data, columns=["Pulse Number", "Signal"])
+        self.pulses = self.df["Pulse Number"].to_numpy(dtype=float)
+        self.signal = self.df["Signal"].to_numpy(dtype=float)
 
         # Enable save button after successful load
         self.btn_save["state"] = tk.NORMAL
@@ -109,59 +119,177 @@ class PulsePlotter:
         # Start animated plot
         self.animate_plot()
 
+    def read_settings(self):
+        """Current plot settings from the widgets."""
+        return {
+            "framerate": int(self.framerate_var.get()),
+            "line_style": self.line_style_var.get(),
+            "marker_style": self.marker_var.get(),
+            "line_color": self.color_var.get(),
+            "title": self.title_entry.get(),
+            "points_per_frame": max(1, int(self.points_per_frame_var.get())),
+        }
+
+    def data_limits(self):
+        """Fixed axis limits that fit the whole run, so frames never rescale the axes."""
+        def padded(values):
+            if len(values) == 0:
+                return 0.0, 1.0
+            low, high = float(values.min()), float(values.max())
+            margin = (high - low) * 0.05 or 1.0
+            return low - margin, high + margin
+        return padded(self.pulses), padded(self.signal)
+
+    def setup_axes(self, ax, settings):
+        """Draw the static part of the chart on ax and return the (animated) pulse line."""
+        ax.clear()
+        ax.set_xlabel("Pulse Number")
+        ax.set_ylabel("Signal (uV*sec)")
+        ax.set_title(settings["title"])
+        ax.grid(True)
+        xlim, ylim = self.data_limits()
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        line, = ax.plot([], [], marker=settings["marker_style"], linestyle=settings["line_style"],
+                        color=settings["line_color"], animated=True)
+        return line
+
+    def frame_count(self, points_per_frame):
+        return -(-len(self.pulses) // points_per_frame)  # The last frame may hold fewer points
+
     def animate_plot(self):
         # Get user-selected settings
-        framerate = int(self.framerate_var.get())
-        line_style = self.line_style_var.get()
-        marker_style = self.marker_var.get()
-        line_color = self.color_var.get()
-        title = self.title_entry.get()
-        points_per_frame = int(self.points_per_frame_var.get())
-
-        self.ax.clear()
-        self.ax.set_xlabel("Pulse Number")
-        self.ax.set_ylabel("Signal (uV*sec)")
-        self.ax.set_title(title)
-        self.ax.grid(True)
-
-        x_data, y_data = [], []
-        line, = self.ax.plot([], [], marker=marker_style, linestyle=line_style, color=line_color)
+        settings = self.read_settings()
+        points_per_frame = settings["points_per_frame"]
+        total = len(self.pulses)
+
+        if self.ani is not None:
+            self.ani.event_source.stop()
+        line = self.setup_axes(self.ax, settings)
 
         # Initialize progress bar
-        self.progress_bar["maximum"] = len(self.df)
+        self.progress_bar["maximum"] = total
         self.progress_bar["value"] = 0
         self.progress_label.config(text="Progress: 0%")
 
+        def init():
+            line.set_data([], [])
+            return line,
+
         def update(frame):
-            if frame * points_per_frame < len(self.df):
-                for i in range(points_per_frame):
-                    idx = frame * points_per_frame + i
-                    if idx < len(self.df):
-                        x_data.append(self.df["Pulse Number"].iloc[idx])
-                        y_data.append(self.df["Signal"].iloc[idx])
-                line.set_data(x_data, y_data)
-                self.ax.relim()
-                self.ax.autoscale_view()
-                self.canvas.draw()
-
-                # Update progress bar and label
-                self.progress_bar["value"] = (frame + 1) * points_per_frame
-                progress_percent = int((frame + 1) * points_per_frame / len(self.df) * 100)
-                self.progress_label.config(text=f"Progress: {progress_percent}%")
-                self.root.update_idletasks()  # Refresh the Tkinter window
-
-                print(f"Frame {frame}: {x_data[-points_per_frame:]}, {y_data[-points_per_frame:]}")  # Debugging print
+            # Views of the precomputed arrays: no copying, no rescaling, only the line is blitted
+            end = min((frame + 1) * points_per_frame, total)
+            line.set_data(self.pulses[:end], self.signal[:end])
+            if end == total:
+                # Blitted artists stay animated; make the finished line part of normal redraws (e.g. resize)
+                self.root.after(settings["framerate"], self.finish_animation, line)
+
+            # Update progress bar and label
+            self.progress_bar["value"] = end
+            self.progress_label.config(text=f"Progress: {int(end / total * 100)}%")
             return line,
 
-        self.ani = animation.FuncAnimation(self.fig, update, frames=len(self.df)//points_per_frame, interval=framerate, repeat=False)
+        self.ani = animation.FuncAnimation(self.fig, update, frames=self.frame_count(points_per_frame),
+                                           init_func=init, interval=settings["framerate"],
+                                           blit=True, repeat=False)
+        self.canvas.draw_idle()
+
+    def finish_animation(self, line):
+        line.set_animated(False)
+        self.canvas.draw_idle()
+
+    def render_frames(self, settings, dpi=None):
+        """Render every animation frame offscreen and yield it as an RGBA array.
+
+        The axes, grid and labels are drawn once; each frame only restores that
+        background and draws the pulse line on top of it.
+        """
+        fig = Figure(figsize=self.fig.get_size_inches(), dpi=dpi or self.fig.dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        line = self.setup_axes(ax, settings)
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+
+        points_per_frame = settings["points_per_frame"]
+        for frame in range(self.frame_count(points_per_frame)):
+            end = min((frame + 1) * points_per_frame, len(self.pulses))
+            canvas.restore_region(background)
+            line.set_data(self.pulses[:end], self.signal[:end])
+            ax.draw_artist(line)
+            yield np.asarray(canvas.buffer_rgba())
+
+    def write_with_ffmpeg(self, filename, frames, fps):
+        """Pipe raw RGBA frames into ffmpeg (MP4 with H.264, or GIF with an optimized palette)."""
+        frames = iter(frames)
+        first = next(frames)
+        height, width = first.shape[:2]
+        command = [
+            animation.FFMpegWriter.bin_path(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        ]
+        if filename.lower().endswith(".gif"):
+            command += ["-vf", "split[a][b];[a]palettegen[p];[b][p]paletteuse"]
+        else:
+            command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-vcodec", "libx264", "-pix_fmt", "yuv420p"]
+        process = subprocess.Popen(command + [filename], stdin=subprocess.PIPE)
+        try:
+            process.stdin.write(first.tobytes())
+            for frame in frames:
+                process.stdin.write(frame.tobytes())
+        finally:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed while writing {filename}")
+
+    def write_gif_with_pillow(self, filename, frames, fps):
+        """Quantize every frame to the palette of the first one and save a GIF with Pillow."""
+        images = []
+        for frame in frames:
+            image = Image.fromarray(frame).convert("RGB")
+            if images:
+                images.append(image.quantize(palette=images[0], dither=Image.Dither.NONE))
+            else:
+                images.append(image.quantize(colors=256))
+        images[0].save(filename, save_all=True, append_images=images[1:],
+                       duration=max(int(1000 / fps), 1), loop=0)
 
     def save_animation(self):
-        if self.ani:
-            filename = filedialog.asksaveasfilename(defaultextension=".gif", filetypes=[("GIF files", "*.gif")])
-            if filename:
-                writer = PillowWriter(fps=144)
-                self.ani.save(filename, writer=writer)
-                print(f"Animation saved as {filename}")
+        if self.df is None:
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".gif",
+                                                filetypes=[("GIF files", "*.gif"), ("MP4 files", "*.mp4")])
+        if not filename:
+            return
+
+        settings = self.read_settings()
+        total_frames = self.frame_count(settings["points_per_frame"])
+        has_ffmpeg = shutil.which(animation.FFMpegWriter.bin_path()) is not None
+        if not filename.lower().endswith(".gif") and not has_ffmpeg:
+            messagebox.showerror("Export Error", "Saving MP4 files requires ffmpeg.")
+            return
+
+        def with_progress(frames):
+            # Refresh the progress bar about 100 times, not on every frame
+            step = max(total_frames // 100, 1)
+            self.progress_bar["maximum"] = total_frames
+            for i, frame in enumerate(frames, start=1):
+                yield frame
+                if i % step == 0 or i == total_frames:
+                    self.progress_bar["value"] = i
+                    self.progress_label.config(text=f"Exporting: {int(i / total_frames * 100)}%")
+                    self.root.update_idletasks()
+
+        frames = with_progress(self.render_frames(settings))
+        try:
+            if has_ffmpeg:
+                self.write_with_ffmpeg(filename, frames, EXPORT_FPS)
+            else:
+                self.write_gif_with_pillow(filename, frames, EXPORT_FPS)
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Could not save {os.path.basename(filename)}: {e}")
+            return
+        print(f"Animation saved as {filename}")
 
 # Run the Tkinter application
 root = tk.Tk()
@@ -0,0 +1,178 @@
+"""Headless batch processing for XRD and FTIR series.
+
+Parses every file, optionally applies the ALS baseline correction and the
+Savitzky-Golay filter on a process pool, writes the processed curves as CSV
+(one file per curve plus one wide table of the whole stack) and renders
+Overlap and Separate figures without a display.
+
+Examples:
+
+    python batch_spectra.py xrd "overnight/*.txt" --out results --baseline --savgol 11 3
+    python batch_spectra.py ftir ftir_data --out results --offset 0.5
+"""
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # Render to files only, no display needed
+import matplotlib.pyplot as plt
+import pandas as pd
+
+import spectra
+from spectra import SpectrumStack
+
+# Define a UniWien color palette
+UNIWEN_COLORS = ["#002147", "#d71920", "#ffcc00", "#4e7ab1", "#8fb339", "#6d6e70", "#005f83", "#ff9d00"]
+
+# Per data type: parser, column names, axis labels, x-limits and the default Separate-plot offset
+DATA_TYPES = {
+    "xrd": {
+        "parse": spectra.parse_xrd_file,
+        "columns": ("Angle", "Intensity"),
+        "xlabel": "2θ (degrees)",
+        "ylabel": "Intensity (a.u.)",
+        "xlim": None,
+        "offset": 1000,
+    },
+    "ftir": {
+        "parse": spectra.parse_ftir_file,
+        "columns": ("Wavenumber", "Transmittance"),
+        "xlabel": "Wavenumber (cm^-1)",
+        "ylabel": "Transmittance",
+        "xlim": (4000, 400),
+        "offset": 10,  # Transmittance runs from 0 to 100
+    },
+}
+
+
+def find_files(source):
+    """Return the sorted list of files in a directory, or matching a glob pattern."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source) if not name.startswith('.')]
+    else:
+        paths = glob.glob(source)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def process_file(kind, filename, cutoff=0, baseline=False, savgol=None):
+    """Parse one file and apply the cutoff, baseline correction and smoothing."""
+    x_name, y_name = DATA_TYPES[kind]["columns"]
+    data = DATA_TYPES[kind]["parse"](filename).dropna()
+    if cutoff > 0:
+        data = data[data[x_name] >= cutoff]
+
+    x = data[x_name].to_numpy(dtype=float)
+    y = data[y_name].to_numpy(dtype=float)
+    if baseline:
+        y = spectra.als_baseline_correction(y)
+    if savgol is not None:
+        y = spectra.apply_savgol_filter(y, *savgol)
+    return x, y
+
+
+def _process_job(job):
+    # Worker entry point: never raise, so one bad file does not stop the batch
+    kind, filename, cutoff, baseline, savgol = job
+    try:
+        return filename, process_file(kind, filename, cutoff, baseline, savgol), None
+    except Exception as e:
+        return filename, None, str(e)
+
+
+def process_files(kind, filenames, cutoff=0, baseline=False, savgol=None, workers=None):
+    """Process files on a process pool; return (filename, x, y) results and (filename, error) failures."""
+    jobs = [(kind, filename, cutoff, baseline, savgol) for filename in filenames]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (4 * workers))
+    results, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for filename, curve, error in executor.map(_process_job, jobs, chunksize=chunksize):
+            if error is None:
+                results.append((filename, *curve))
+            else:
+                failures.append((filename, error))
+    return results, failures
+
+
+def write_curves(kind, results, output_folder):
+    """Write each processed curve to <name>_processed.csv in output_folder."""
+    x_name, y_name = DATA_TYPES[kind]["columns"]
+    for filename, x, y in results:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        output_file = os.path.join(output_folder, f"{name}_processed.csv")
+        pd.DataFrame({x_name: x, y_name: y}).to_csv(output_file, index=False)
+
+
+def stack_curves(results):
+    """Put the processed curves on one common x axis as a SpectrumStack."""
+    return SpectrumStack.from_curves(
+        [(x, y) for _, x, y in results],
+        labels=[os.path.splitext(os.path.basename(filename))[0] for filename, _, _ in results],
+        colors=[UNIWEN_COLORS[i % len(UNIWEN_COLORS)] for i in range(len(results))],
+        sources=[filename for filename, _, _ in results],
+    )
+
+
+def plot_curves(kind, stack, output_file, offset=0):
+    """Save one figure with all curves, shifted by offset per curve if offset is non-zero."""
+    settings = DATA_TYPES[kind]
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if offset:
+        stack = stack.offset(offset)
+    # One collection for all curves keeps large series fast to render
+    _, handles = stack.plot(ax, linewidth=1)
+
+    if settings["xlim"] is not None:
+        ax.set_xlim(*settings["xlim"])
+    ax.set_xlabel(settings["xlabel"])
+    ax.set_ylabel(settings["ylabel"])
+    if len(stack) <= 20:  # Legends with hundreds of entries cover the plot
+        ax.legend(handles=handles, loc="upper right", fontsize=8)
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300)
+    plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-process XRD or FTIR series without the GUI.")
+    parser.add_argument("kind", choices=sorted(DATA_TYPES), help="data type of the input files")
+    parser.add_argument("source", help="folder or glob pattern of input files")
+    parser.add_argument("--out", default="batch_output", help="output folder (default: batch_output)")
+    parser.add_argument("--cutoff", type=float, default=0, help="ignore points below this x value")
+    parser.add_argument("--baseline", action="store_true", help="apply ALS baseline correction")
+    parser.add_argument("--savgol", type=int, nargs=2, metavar=("WINDOW", "POLYORDER"),
+                        help="apply a Savitzky-Golay filter")
+    parser.add_argument("--offset", type=float, default=None,
+                        help="offset between curves in the Separate plot (default: 1000 for xrd, 10 for ftir)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    offset = DATA_TYPES[args.kind]["offset"] if args.offset is None else args.offset
+
+    filenames = find_files(args.source)
+    if not filenames:
+        print(f"No files found for {args.source}")
+        return 1
+
+    os.makedirs(args.out, exist_ok=True)
+    print(f"Processing {len(filenames)} files...")
+    results, failures = process_files(args.kind, filenames, args.cutoff, args.baseline, args.savgol, args.workers)
+    for filename, error in failures:
+        print(f"Error processing {filename}: {error}")
+    if not results:
+        return 1
+
+    write_curves(args.kind, results, args.out)
+    stack = stack_curves(results)
+    stack.export(os.path.join(args.out, f"{args.kind}_stack.csv"), x_name=DATA_TYPES[args.kind]["columns"][0])
+    plot_curves(args.kind, stack, os.path.join(args.out, f"{args.kind}_overlap.png"))
+    plot_curves(args.kind, stack, os.path.join(args.out, f"{args.kind}_separate.png"), offset=offset)
+    print(f"Processed {len(results)} files, results saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
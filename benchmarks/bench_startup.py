@@ -0,0 +1,105 @@
+"""Cold-start import time of every GUI tool, measured in fresh interpreters.
+
+For each tool the module-level import statements are extracted from its
+source and run in a new Python process, which is what the tool pays before
+its first window can appear. The heavy optional dependencies that are
+already loaded at that point are listed next to the time; they should only
+show up when a tool cannot work without them.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--repeat 5] [--only XRD NMR] [--save startup.json]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEVICE_SCRIPTS = os.path.join(ROOT, "Device Specific Scripts")
+
+TOOLS = [
+    "XRD Plot", "FTIR Plot", "UV", "TGA Plot", "Flow Integrator", "NMR", "Chemplot", "HER Plots",
+    "Sorbtion Isotherm.py",
+    os.path.join("Device Specific Scripts", "Knudsen Plot.py"),
+    os.path.join("Device Specific Scripts", "linear regression Knudsen.py"),
+    os.path.join("Device Specific Scripts", "Regression UVVIS"),
+    os.path.join("Device Specific Scripts", "extract data.py"),
+    os.path.join("Device Specific Scripts", "Porosity Data Plot"),
+]
+HEAVY_MODULES = ["scipy", "seaborn", "mpl_toolkits.mplot3d", "nmrglue", "rdkit", "IPython", "PyQt5"]
+
+# Runs in the child: imports the tool's dependencies, then reports which heavy modules are loaded
+CHILD = """
+import sys, json
+sys.path[:0] = {paths!r}
+{imports}
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]))
+"""
+
+
+def module_imports(path):
+    """Source of the import statements a script runs at module level (including inside try blocks)."""
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(node)
+        elif isinstance(node, ast.Try):
+            # Keep the whole try/except so version fallbacks behave as in the tool
+            statements.append(node)
+    return "\n".join(ast.unparse(node) for node in statements)
+
+
+def time_child(code, repeat):
+    """Best wall time of running code in a fresh interpreter and its last stdout line."""
+    best, output = None, ""
+    env = dict(os.environ, MPLBACKEND="Agg")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+        output = result.stdout.strip().splitlines()[-1]
+    return best, output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per tool; the best is kept (default: 5)")
+    parser.add_argument("--only", nargs="+", help="measure only tools whose name contains one of these strings")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    interpreter, _ = time_child("print([])", args.repeat)
+    print(f"{'bare interpreter':<55}{interpreter * 1000:9.0f} ms")
+
+    results = {}
+    for tool in TOOLS:
+        if args.only and not any(part in tool for part in args.only):
+            continue
+        code = CHILD.format(paths=[ROOT, DEVICE_SCRIPTS], imports=module_imports(os.path.join(ROOT, tool)),
+                            heavy=HEAVY_MODULES)
+        try:
+            seconds, loaded = time_child(code, args.repeat)
+        except RuntimeError as e:
+            print(f"{tool:<55}{'skipped':>12}  ({e})")
+            continue
+        loaded = json.loads(loaded)
+        results[tool] = {"seconds": seconds, "heavy_modules": loaded}
+        print(f"{tool:<55}{seconds * 1000:9.0f} ms  {', '.join(loaded)}")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({"interpreter_seconds": interpreter, "tools": results}, file, indent=2)
+        print(f"Results saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the "[Scan points]" fast loader against the row-by-row parser.
+
+Run from the repository root:
+
+    python benchmarks/bench_xrd_loader.py [--points 100000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spectra import _parse_scan_points_loop, load_scan_points  # noqa: E402
+from synthetic import write_scan_points_file  # noqa: E402
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scan.txt")
+        write_scan_points_file(path, args.points)
+
+        loop_time, loop_data = best_of(lambda: _parse_scan_points_loop(path), args.repeat)
+        fast_time, fast_data = best_of(lambda: load_scan_points(path), args.repeat)
+
+    if not fast_data.equals(loop_data):
+        raise SystemExit("Fast loader output differs from the row-by-row parser!")
+
+    print(f"{args.points} points, best of {args.repeat}")
+    print(f"  row-by-row loop: {loop_time * 1000:8.1f} ms")
+    print(f"  fast loader:     {fast_time * 1000:8.1f} ms  ({loop_time / fast_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
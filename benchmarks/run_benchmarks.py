@@ -0,0 +1,443 @@
+"""Time and peak memory of every parser and signal-processing stage on synthetic data.
+
+Each case writes synthetic files in the instrument's format (setup is not
+timed), then runs one stage of the toolkit. Point cases scale the size of a
+single file or signal, file cases the number of files. Results can be saved
+as a JSON baseline and compared against it later; a case that got slower
+than --tolerance times its baseline makes the run exit with status 1.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --save baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --only xrd flow
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+
+import matplotlib
+matplotlib.use("Agg")  # Render offscreen only
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEVICE_SCRIPTS = os.path.join(ROOT, "Device Specific Scripts")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, DEVICE_SCRIPTS)
+import synthetic  # noqa: E402
+
+POINT_SIZES = [1000, 10000, 100000, 1000000]
+FILE_COUNTS = [1, 10, 100, 1000]
+QUICK_POINT_SIZES = [1000, 100000]
+QUICK_FILE_COUNTS = [1, 100]
+FILE_POINTS = 5000  # Points per spectrum in the file cases
+
+CASES = []
+
+
+def case(name, axis):
+    """Register setup(folder, n) -> stage function as a benchmark over "points" or "files"."""
+    def register(setup):
+        CASES.append((name, axis, setup))
+        return setup
+    return register
+
+
+def load_script(file_name, folder=ROOT):
+    """Import one of the extensionless (or space-named) scripts as a module."""
+    path = os.path.join(folder, file_name)
+    module_name = "bench_" + "".join(char if char.isalnum() else "_" for char in file_name)
+    loader = SourceFileLoader(module_name, path)
+    module = module_from_spec(spec_from_loader(module_name, loader))
+    loader.exec_module(module)
+    return module
+
+
+# --- Cases that scale with the number of points -------------------------------
+
+@case("xrd.load_scan_points", "points")
+def _xrd_scan_points(folder, n):
+    from spectra import load_scan_points
+    path = os.path.join(folder, "scan.txt")
+    synthetic.write_scan_points_file(path, n)
+    return lambda: load_scan_points(path)
+
+
+@case("xrd.parse_xy", "points")
+def _xrd_xy(folder, n):
+    from spectra import parse_xrd_file
+    path = os.path.join(folder, "scan.xy")
+    synthetic.write_xy_file(path, n)
+    return lambda: parse_xrd_file(path)
+
+
+@case("ftir.parse", "points")
+def _ftir_parse(folder, n):
+    from spectra import parse_ftir_file
+    path = os.path.join(folder, "ftir.txt")
+    synthetic.write_ftir_file(path, n)
+    return lambda: parse_ftir_file(path)
+
+
+@case("spectra.als_baseline", "points")
+def _als(folder, n):
+    from spectra import als_baseline_correction
+    _, intensity = synthetic.xrd_pattern(n)
+    return lambda: als_baseline_correction(intensity)
+
+
+@case("spectra.savgol", "points")
+def _savgol(folder, n):
+    from spectra import apply_savgol_filter
+    _, intensity = synthetic.xrd_pattern(n)
+    return lambda: apply_savgol_filter(intensity, 11, 3)
+
+
+@case("flow.process_file", "points")
+def _flow_process(folder, n):
+    from flow_integration import process_file
+    path = os.path.join(folder, "emerson.txt")
+    synthetic.write_emerson_log(path, n)
+    return lambda: process_file(path, 0)
+
+
+@case("flow.integrate_peaks", "points")
+def _flow_peaks(folder, n):
+    from flow_integration import integrate_peaks
+    seconds = np.arange(n, dtype=np.float64)
+    signal = 5 + synthetic._peaks(seconds, np.arange(600, n, 600), 40, 800)
+    signal += np.random.default_rng(0).normal(0, 1, n)
+    return lambda: integrate_peaks(seconds / 3600, signal)
+
+
+@case("flow.live_poll", "points")
+def _flow_live(folder, n):
+    from flow_integration import LogTail
+    path = os.path.join(folder, "emerson.txt")
+    synthetic.write_emerson_log(path, n + 50)
+    with open(path, 'rb') as file:
+        lines = file.readlines()
+    with open(path, 'wb') as file:
+        file.writelines(lines[:-50])
+    tail = LogTail(path)
+    tail.poll()  # Catch up with the first n rows; each timed run then reads five more
+    appended = iter(lines[-50:])
+
+    def run():
+        with open(path, 'ab') as file:
+            file.writelines(next(appended, b"") for _ in range(5))
+        return tail.poll()
+    return run
+
+
+@case("tga.load_csv", "points")
+def _tga_load(folder, n):
+    from tga_analysis import load_tga_csv
+    path = os.path.join(folder, "tga.csv")
+    synthetic.write_tga_csv(path, n)
+    return lambda: load_tga_csv(path)
+
+
+@case("tga.dtg_onset", "points")
+def _tga_dtg(folder, n):
+    from tga_analysis import dtg, onset_temperatures, resample_runs
+    _, weight, temperature = synthetic.tga_run(n)
+
+    def run():
+        grid, matrix = resample_runs([(temperature, weight)], step=1.0, start_temperature=100)
+        derivative = dtg(grid, matrix)
+        return onset_temperatures(grid, matrix, derivative)
+    return run
+
+
+@case("trios.extract_data", "points")
+def _trios(folder, n):
+    trios = load_script("Trios TGA files", DEVICE_SCRIPTS)
+    path = os.path.join(folder, "trios.txt")
+    synthetic.write_trios_export(path, n)
+    return lambda: trios.extract_data(path)
+
+
+@case("uvvis.read", "points")
+def _uvvis_read(folder, n):
+    from uvvis import read_uvvis_file
+    path = os.path.join(folder, "uvvis.csv")
+    synthetic.write_uvvis_file(path, n)
+    return lambda: read_uvvis_file(path)
+
+
+@case("knudsen.analyse_file", "points")
+def _knudsen(folder, n):
+    from knudsen_regression import analyse_file
+    path = os.path.join(folder, "knudsen.csv")
+    synthetic.write_knudsen_csv(path, n)
+    return lambda: analyse_file(path)
+
+
+@case("pressure.read_log", "points")
+def _pressure(folder, n):
+    extract = load_script("extract data.py", DEVICE_SCRIPTS)
+    path = os.path.join(folder, "pressure.csv")
+    synthetic.write_pressure_log(path, n)
+    return lambda: extract.read_pressure_log(path)
+
+
+@case("nmr.load_view", "points")
+def _nmr(folder, n):
+    from nmr_session import BrukerSpectrum  # Needs nmrglue
+    pdata_dir = synthetic.write_bruker_pdata(folder, n)
+    return lambda: BrukerSpectrum(pdata_dir).view(10.0, 0.0, pixels=2000)
+
+
+@case("nmr.zoom_view", "points")
+def _nmr_zoom(folder, n):
+    from nmr_session import BrukerSpectrum  # Needs nmrglue
+    spectrum = BrukerSpectrum(synthetic.write_bruker_pdata(folder, n))
+    spectrum.view(10.0, 0.0, pixels=2000)  # Builds the pyramid once, as the first refresh does
+    windows = [(10.0 - shift, 10.0 - shift - width) for width in (10.0, 2.0, 0.2) for shift in (0.0, 1.0, 3.0)]
+    return lambda: [spectrum.view(a, b, pixels=2000) for a, b in windows]
+
+
+# --- Cases that scale with the number of files --------------------------------
+
+def _write_many(folder, count, write, suffix):
+    paths = [os.path.join(folder, f"{i:05d}{suffix}") for i in range(count)]
+    for i, path in enumerate(paths):
+        write(path, i)
+    return paths
+
+
+@case("xrd.parse_files", "files")
+def _xrd_files(folder, n):
+    from spectra import load_scan_points
+    paths = _write_many(folder, n, lambda path, i: synthetic.write_scan_points_file(path, FILE_POINTS, i), ".txt")
+    return lambda: [load_scan_points(path) for path in paths]
+
+
+@case("stack.baseline_smooth", "files")
+def _stack_process(folder, n):
+    from spectra import SpectrumStack
+    curves = [synthetic.xrd_pattern(FILE_POINTS, seed) for seed in range(n)]
+    return lambda: SpectrumStack.from_curves(curves).baseline_corrected().smoothed(11, 3)
+
+
+@case("stack.render", "files")
+def _stack_render(folder, n):
+    import matplotlib.pyplot as plt
+    from spectra import SpectrumStack
+    stack = SpectrumStack.from_curves([synthetic.xrd_pattern(FILE_POINTS, seed) for seed in range(n)])
+
+    def run():
+        fig, ax = plt.subplots(figsize=(10, 6))
+        stack.offset(1000).plot(ax)
+        fig.canvas.draw()
+        plt.close(fig)
+    return run
+
+
+@case("uvvis.calibration", "files")
+def _uvvis_calibration(folder, n):
+    from uvvis import Calibration
+    paths = _write_many(folder, n, lambda path, i: synthetic.write_uvvis_file(path, 1201, i % 50 + 1, i), ".csv")
+
+    def run():
+        calibration = Calibration.from_files(paths)
+        return calibration.fit_wavelengths()
+    return run
+
+
+@case("porosity.index_stats", "points")
+def _porosity_index(folder, n):
+    from results_index import ResultsIndex
+    rng = np.random.default_rng(0)
+    index = ResultsIndex(os.path.join(folder, "results_index.sqlite"))
+    # n porosity values from reports of 50 samples, ten values per report
+    for report in range(max(1, n // 10)):
+        index.replace("porosity", os.path.join(folder, f"campaign_{report % 7}", f"Sample {report % 50}_{report}.txt"),
+                      rng.uniform(20, 60, 10).tolist())
+
+    def run():
+        return index.group_stats("porosity", min_value=0)
+    return run
+
+
+def _molecules_case(cached):
+    def setup(folder, n):
+        from molecules import read_structures, render_batch
+        path = os.path.join(folder, "compounds.csv")
+        synthetic.write_compound_list(path, n)
+        rows = read_structures(path)
+        runs = itertools.count()
+        cache = os.path.join(folder, "cache")
+        if cached:
+            render_batch(rows, cache, workers=1)
+
+        def run():
+            # In-process, so the time is rendering only; a cold run starts from an empty cache
+            return render_batch(rows, cache if cached else os.path.join(folder, f"cold_{next(runs)}"), workers=1)
+        return run
+    return setup
+
+
+case("molecules.render", "files")(_molecules_case(cached=False))
+case("molecules.render_cached", "files")(_molecules_case(cached=True))
+
+
+def _extraction_case(script_name, extract_name, write_report, cached):
+    def setup(folder, n):
+        from extraction_runner import find_reports, run_extraction
+        script = load_script(script_name, DEVICE_SCRIPTS)
+        extract = getattr(script, extract_name)
+        reports = os.path.join(folder, "reports")
+        os.makedirs(reports)
+        _write_many(reports, n, lambda path, i: write_report(path, seed=i), ".txt")
+        manifest = os.path.join(folder, "manifest.json")
+        if cached:
+            run_extraction(find_reports(reports), extract, manifest)
+
+        def run():
+            if not cached and os.path.exists(manifest):
+                os.remove(manifest)
+            return run_extraction(find_reports(reports), extract, manifest)
+        return run
+    return setup
+
+
+case("accupyc.extract", "files")(_extraction_case(
+    "Accupyc Data Extract to CSV", "extract_density_rows", synthetic.write_accupyc_report, cached=False))
+case("accupyc.extract_unchanged", "files")(_extraction_case(
+    "Accupyc Data Extract to CSV", "extract_density_rows", synthetic.write_accupyc_report, cached=True))
+case("geopycc.extract", "files")(_extraction_case(
+    "Geopycc Porosity Extraction", "extract_porosity_rows", synthetic.write_geopycc_report, cached=False))
+
+
+# --- Runner -------------------------------------------------------------------
+
+def measure(func, repeat):
+    """Best wall time of repeat runs, then the peak traced memory (MiB) of one more run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak / 2 ** 20
+
+
+def run_cases(point_sizes, file_counts, repeat, only=None):
+    """Run every selected case at every size; returns {"name[n]": {...}} and the skipped cases."""
+    results, skipped = {}, []
+    for name, axis, setup in CASES:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        for n in point_sizes if axis == "points" else file_counts:
+            key = f"{name}[{n}]"
+            with tempfile.TemporaryDirectory() as folder:
+                try:
+                    # Keep the stages' progress prints and parser warnings out of the table
+                    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        func = setup(folder, n)
+                        seconds, peak_mib = measure(func, repeat)
+                except ImportError as e:
+                    skipped.append((name, f"missing dependency: {e.name}"))
+                    break
+                except Exception as e:
+                    skipped.append((key, f"{type(e).__name__}: {e}"))
+                    continue
+            results[key] = {"case": name, "axis": axis, "n": n, "seconds": seconds, "peak_mib": peak_mib}
+            print(f"{key:45s} {seconds * 1000:10.2f} ms {peak_mib:10.2f} MiB", flush=True)
+    return results, skipped
+
+
+def environment():
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results, baseline, tolerance, min_seconds=0.005):
+    """Print the ratio to the baseline per case; returns the keys that regressed."""
+    regressions = []
+    print(f"\n{'case':45s} {'baseline':>12s} {'now':>12s} {'ratio':>8s}")
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        ratio = result["seconds"] / reference["seconds"] if reference["seconds"] > 0 else float("inf")
+        slower = ratio > tolerance and result["seconds"] - reference["seconds"] > min_seconds
+        flag = "  SLOWER" if slower else ""
+        print(f"{key:45s} {reference['seconds'] * 1000:9.2f} ms {result['seconds'] * 1000:9.2f} ms {ratio:8.2f}{flag}")
+        if slower:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true",
+                        help=f"sizes {QUICK_POINT_SIZES} points and {QUICK_FILE_COUNTS} files only")
+    parser.add_argument("--points", type=int, nargs="+", help=f"signal sizes (default: {POINT_SIZES})")
+    parser.add_argument("--files", type=int, nargs="+", help=f"file counts (default: {FILE_COUNTS})")
+    parser.add_argument("--only", nargs="+", help="run only cases whose name contains one of these strings")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is kept (default: 3)")
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="compare against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="slowdown factor that counts as a regression (default: 1.5)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, axis, _ in CASES:
+            print(f"{name:35s} scales with {axis}")
+        return 0
+
+    point_sizes = args.points or (QUICK_POINT_SIZES if args.quick else POINT_SIZES)
+    file_counts = args.files or (QUICK_FILE_COUNTS if args.quick else FILE_COUNTS)
+    results, skipped = run_cases(point_sizes, file_counts, args.repeat, args.only)
+    for name, reason in skipped:
+        print(f"Skipped {name}: {reason}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {args.tolerance}x the baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
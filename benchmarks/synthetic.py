@@ -0,0 +1,188 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _peaks(x, centers, width, height):
+    """Sum of Gaussian peaks on x."""
+    y = np.zeros_like(x)
+    for center in centers:
+        y += height * np.exp(-0.5 * ((x - center) / width) ** 2)
+    return y
+
+
+def write_scan_points_file(path, points, seed=0):
+    """Write a synthetic Panalytical-style export with a header and a 4-column block."""
+    rng = np.random.default_rng(seed)
+    angle = np.linspace(5.0, 90.0, points)
+    intensity = rng.uniform(50.0, 10000.0, points)
+    with open(path, 'w') as file:
+        file.write("[Measurement conditions]\n")
+        file.write("Anode material=Cu\n")
+        file.write("Scan axis=Gonio\n")
+        file.write("[Scan points]\n")
+        file.write("Angle,Time,Intensity,ESD\n")
+        np.savetxt(file, np.column_stack((angle, np.full(points, 0.5), intensity, np.sqrt(intensity))),
+                   fmt=("%.6f", "%.1f", "%.3f", "%.3f"), delimiter=",")
+
+
+def xrd_pattern(points, seed=0):
+    """2θ axis and an XRD-like pattern: sharp peaks on a sloping background with noise."""
+    rng = np.random.default_rng(seed)
+    angle = np.linspace(5.0, 90.0, points)
+    intensity = 200 + 2 * angle + _peaks(angle, [12.5, 26.6, 33.1, 47.5, 56.2], 0.15, 3000)
+    return angle, intensity + rng.normal(0, 20, points)
+
+
+def write_xy_file(path, points, seed=0):
+    angle, intensity = xrd_pattern(points, seed)
+    np.savetxt(path, np.column_stack((angle, intensity)), fmt="%.6f %.3f")
+
+
+def write_ftir_file(path, points, seed=0):
+    """Whitespace-separated wavenumber (4000 -> 400 cm^-1) and transmittance."""
+    rng = np.random.default_rng(seed)
+    wavenumber = np.linspace(4000.0, 400.0, points)
+    transmittance = 95 - _peaks(wavenumber, [3400, 2920, 1630, 1100], 30, 40) + rng.normal(0, 0.2, points)
+    np.savetxt(path, np.column_stack((wavenumber, transmittance)), fmt="%.4f\t%.4f")
+
+
+def write_emerson_log(path, points, seed=0, peak_every=600):
+    """Emerson gas-analyzer log: 8 header lines, then one tab-separated row per second."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp("2024-01-15 08:00:00") + pd.to_timedelta(np.arange(points), unit="s")
+    seconds = np.arange(points)
+    ch3 = 5 + _peaks(seconds.astype(np.float64), np.arange(peak_every, points, peak_every), 40, 800)
+    ch3 += rng.normal(0, 1, points)
+    zeros = np.zeros(points)
+    table = pd.DataFrame({
+        "Date": timestamps.strftime("%d.%m.%Y"),
+        "Time": timestamps.strftime("%H:%M:%S"),
+        "Ch1_ppm": zeros, "Ch1_Status": "OK",
+        "Ch2_ppm": zeros, "Ch2_Status": "OK",
+        "Ch3_ppm": np.round(ch3, 3), "Ch3_Status": "OK",
+        "Ch4_ppm": zeros, "Ch4_Status": "OK",
+    })
+    with open(path, 'w') as file:
+        for i in range(8):
+            file.write(f"Header line {i}\n")
+        table.to_csv(file, sep="\t", header=False, index=False)
+
+
+def tga_run(points, seed=0, onset=350.0):
+    """Time (min), weight (mg) and program temperature (°C) of a one-step decomposition."""
+    rng = np.random.default_rng(seed)
+    temperature = np.linspace(25.0, 800.0, points)
+    weight = 10 - 4 / (1 + np.exp(-(temperature - onset - 30) / 15)) + rng.normal(0, 1e-4, points)
+    return temperature / 10, weight, temperature
+
+
+def write_tga_csv(path, points, seed=0):
+    time, weight, temperature = tga_run(points, seed)
+    pd.DataFrame({
+        "Time": time,
+        "Unsubtracted Weight": weight,
+        "Program Temperature": temperature,
+        "Sample Purge Flow": np.full(points, 50.0),
+    }).to_csv(path, index=False)
+
+
+def write_trios_export(path, points, seed=0):
+    """TRIOS text export: a Time header line, then tab-separated rows with four columns."""
+    time, weight, temperature = tga_run(points, seed)
+    with open(path, 'w') as file:
+        file.write("Time\tTemperature\tWeight\tWeight (%)\n")
+        np.savetxt(file, np.column_stack((time, temperature, weight, weight * 10)), fmt="%.5f", delimiter="\t")
+
+
+def write_uvvis_file(path, points, concentration=10, seed=0):
+    """UV-Vis export: 19 header lines with a TITLE, a column header, then "nm;A" with decimal commas."""
+    rng = np.random.default_rng(seed)
+    wavelength = np.linspace(200.0, 800.0, points)
+    absorbance = concentration * 0.05 * _peaks(wavelength, [450.0], 20, 1.0) + 0.01 + rng.normal(0, 1e-4, points)
+    header = [f"Header line {i}" for i in range(19)]
+    header[3] = f"TITLE sample {concentration} mg/L"
+    header.append("nm;A")
+    block = pd.DataFrame({"nm": wavelength, "A": absorbance}).to_csv(
+        sep=";", decimal=",", header=False, index=False, float_format="%.6f")
+    with open(path, 'w', encoding='latin1') as file:
+        file.write("\n".join(header) + "\n")
+        file.write(block)
+
+
+def write_accupyc_report(path, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as file:
+        file.write("AccuPyc II 1340\nSample: synthetic\nAnalysis Gas: Helium\n")
+        for cycle in range(1, 11):
+            file.write(f"Cycle {cycle}: Volume: {rng.uniform(0.9, 1.1):.4f} cm³\n")
+        file.write(f"Density: {rng.uniform(2.0, 3.0):.4f} g/cm³\n")
+        file.write("Standard Deviation: 0.0012 g/cm³\n")
+
+
+def write_geopycc_report(path, seed=0, measurements=5):
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as file:
+        file.write("GeoPyc 1365\nSample: synthetic\n")
+        for _ in range(measurements):
+            file.write(f"Envelope Volume: {rng.uniform(1, 2):.4f} cm³\n")
+            file.write(f"Percent Porosity:  {rng.uniform(20, 60):.4f} %\n")
+
+
+def write_knudsen_csv(path, points, seed=0, slope=2.0):
+    """Pressure-rise measurement as analysed by knudsen_regression: time and both channels in Pa."""
+    rng = np.random.default_rng(seed)
+    time = np.arange(points, dtype=np.float64)
+    rise = np.where(time < points * 0.2, 0.0, slope * (time - points * 0.2))
+    pd.DataFrame({
+        "Time(seconds)": time,
+        "CHANNEL0_Pa": 200000 + rng.normal(0, 10, points),
+        "CHANNEL1_Pa": 1000 + rise + rng.normal(0, 0.01, points),
+    }).to_csv(path, index=False)
+
+
+def write_pressure_log(path, points, seed=0):
+    """Raw pressure logger CSV for "extract data.py": 7 preamble rows, then Date/Time and two channels in bar."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp("2024-01-15 08:00:00") + pd.to_timedelta(np.arange(points), unit="s")
+    table = pd.DataFrame({
+        "Date/Time": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+        "Record": np.arange(points),
+        "CHANNEL0": np.round(1.5 + rng.normal(0, 1e-3, points), 5),
+        "CHANNEL1": np.round(1.0 + np.linspace(0, 0.1, points), 5),
+    })
+    with open(path, 'w') as file:
+        for i in range(7):
+            file.write(f"Logger preamble {i}\n")
+        table.to_csv(file, index=False)
+
+
+def write_bruker_pdata(folder, points, seed=0):
+    """Processed 1D Bruker spectrum (<folder>/1/pdata/1 with procs and 1r); returns the pdata folder."""
+    rng = np.random.default_rng(seed)
+    pdata_dir = os.path.join(folder, "1", "pdata", "1")
+    os.makedirs(pdata_dir, exist_ok=True)
+    ppm = np.linspace(12.0, -2.0, points)
+    intensity = _peaks(ppm, [7.26, 3.5, 1.2], 0.01, 1e7) + rng.normal(0, 1e4, points)
+    intensity.astype("<i4").tofile(os.path.join(pdata_dir, "1r"))
+    with open(os.path.join(pdata_dir, "procs"), 'w') as file:
+        file.write("##TITLE= Parameter file\n")
+        file.write(f"##$SI= {points}\n##$SW_p= 5601.82\n##$SF= 400.13\n##$OFFSET= 12.0\n")
+        file.write("##$NC_proc= 0\n##$BYTORDP= 0\n##$DTYPP= 0\n##END=\n")
+    return pdata_dir
+
+
+SCAFFOLDS = ["CCO", "c1ccccc1", "CC(=O)O", "CC(=O)Oc1ccccc1C(=O)O", "CN1C=NC2=C1C(=O)N(C)C(=O)N2C",
+             "OC[C@H]1OC(O)[C@H](O)[C@@H](O)[C@@H]1O", "c1ccc2ccccc2c1", "CCN(CC)CC", "O=C(O)c1ccncc1"]
+
+
+def write_compound_list(path, rows, seed=0):
+    """Name,SMILES compound list; about a fifth of the rows repeat an earlier name and structure."""
+    rng = np.random.default_rng(seed)
+    unique = max(1, rows - rows // 5)
+    # Distinct structures: the scaffolds with ever longer alkyl chains in front
+    structures = ["C" * (i // len(SCAFFOLDS)) + SCAFFOLDS[i % len(SCAFFOLDS)] for i in range(unique)]
+    picks = np.concatenate([np.arange(unique), rng.integers(0, unique, rows - unique)])
+    pd.DataFrame({"Name": [f"compound {i}" for i in picks], "SMILES": [structures[i] for i in picks]}).to_csv(
+        path, index=False)
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+def _minmax_level(x, y, size):
+    """Reduce x/y to the min and max point of every block of size samples.
+
+    Returns interleaved x/y arrays with two points per block, in the order they
+    occur in the data, so the decimated line keeps the shape of every peak.
+    """
+    n_full = len(y) // size * size
+    blocks = [y[:n_full].reshape(-1, size)]
+    starts = [np.arange(0, n_full, size)]
+    if n_full < len(y):
+        # Pad the partial last block with its own first value
+        tail = y[n_full:]
+        blocks.append(np.pad(tail, (0, size - len(tail)), mode="edge")[np.newaxis, :])
+        starts.append(np.array([n_full]))
+    blocks = np.concatenate(blocks)
+    starts = np.concatenate(starts)
+
+    arg_min = blocks.argmin(axis=1)
+    arg_max = blocks.argmax(axis=1)
+    first = np.minimum(arg_min, arg_max)
+    second = np.maximum(arg_min, arg_max)
+    index = np.empty(2 * len(blocks), dtype=np.intp)
+    index[0::2] = starts + first
+    index[1::2] = starts + second
+    index = np.minimum(index, len(y) - 1)
+    return x[index], y[index]
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max envelope of a 1D signal over its point indices.
+
+    The signal itself (e.g. a memmap) is level 0 and is never copied. Each
+    stored level keeps the min and max of blocks of base_size, base_size *
+    factor, ... points; the first one is built chunk by chunk, so a build reads
+    the signal once with memory bounded by chunk_size. view() returns the
+    indices and values to draw for an index range at about the requested
+    number of pixels; ranges too short for the stored levels are decimated on
+    the fly, which reads fewer than pixels * base_size points.
+    """
+
+    def __init__(self, y, factor=4, base_size=64, min_points=1024, chunk_size=1 << 20):
+        if np.ndim(y) != 1:
+            raise ValueError("y must be a 1D array.")
+        self.y = y
+        self.factor = factor
+        self.base_size = base_size
+
+        # levels[k] = (block size, indices, values), two points per block in data order
+        self.levels = []
+        if len(y) // base_size < min_points // 2:
+            return
+        chunk_size = max(chunk_size // base_size, 1) * base_size  # Chunks end on block edges
+        index, values = [], []
+        for start in range(0, len(y), chunk_size):
+            chunk = np.asarray(y[start:start + chunk_size])
+            chunk_index, chunk_values = _minmax_level(np.arange(start, start + len(chunk)), chunk, base_size)
+            index.append(chunk_index)
+            values.append(chunk_values)
+        size = base_size
+        level = (size, np.concatenate(index), np.concatenate(values))
+        while len(level[1]) // 2 >= min_points // 2:
+            self.levels.append(level)
+            # A block of the next level spans factor blocks, i.e. 2 * factor points of this one
+            size *= factor
+            level = (size, *_minmax_level(level[1], level[2], 2 * factor))
+
+    def view(self, start, stop, pixels=2000):
+        """Indices and values to draw for the points start..stop - 1 at about pixels resolution."""
+        start, stop = max(start, 0), min(stop, len(self.y))
+        count = stop - start
+        if count <= 2 * pixels:
+            return np.arange(start, stop), np.asarray(self.y[start:stop])
+
+        # Coarsest stored level that still has at least one block per pixel
+        level = None
+        for candidate in self.levels:
+            if count // candidate[0] < pixels:
+                break
+            level = candidate
+        if level is None:
+            size = self.factor
+            while size * self.factor < self.base_size and count // (size * self.factor) >= pixels:
+                size *= self.factor
+            return _minmax_level(np.arange(start, stop), np.asarray(self.y[start:stop]), size)
+
+        size, index, values = level
+        first_block = start // size
+        last_block = -(-stop // size)
+        return index[2 * first_block:2 * last_block], values[2 * first_block:2 * last_block]
+
+    def __len__(self):
+        return len(self.y)
+
+
+class MinMaxStream:
+    """Min/max envelope of a signal that keeps growing at the end, for live plots.
+
+    Appended points are grouped into blocks of block_size samples and every
+    finished block keeps its min and max point. When there are more than
+    max_blocks blocks, neighbouring blocks are merged and block_size doubles,
+    so view() never returns much more than 2 * max_blocks points however long
+    the signal gets, and append() only touches the new points and the envelope.
+    """
+
+    def __init__(self, max_blocks=2000):
+        self.max_blocks = max_blocks
+        self.block_size = 1
+        self.envelope_x = np.empty(0)
+        self.envelope_y = np.empty(0)
+        self.pending_x = np.empty(0)  # Samples of the block that is not finished yet
+        self.pending_y = np.empty(0)
+        self.count = 0
+
+    def append(self, x, y):
+        x = np.concatenate((self.pending_x, np.asarray(x, dtype=np.float64)))
+        y = np.concatenate((self.pending_y, np.asarray(y, dtype=np.float64)))
+        self.count += len(x) - len(self.pending_x)
+
+        n_full = len(y) // self.block_size * self.block_size
+        if n_full:
+            if self.block_size == 1:
+                block_x, block_y = np.repeat(x[:n_full], 2), np.repeat(y[:n_full], 2)
+            else:
+                block_x, block_y = _minmax_level(x[:n_full], y[:n_full], self.block_size)
+            self.envelope_x = np.concatenate((self.envelope_x, block_x))
+            self.envelope_y = np.concatenate((self.envelope_y, block_y))
+        self.pending_x, self.pending_y = x[n_full:], y[n_full:]
+
+        # Two envelope points per block: merging pairs of blocks is a min/max over 4 points
+        while len(self.envelope_y) > 2 * self.max_blocks:
+            self.envelope_x, self.envelope_y = _minmax_level(self.envelope_x, self.envelope_y, 4)
+            self.block_size *= 2
+
+    def view(self):
+        """All points to draw: the block envelope followed by the unfinished block."""
+        return (np.concatenate((self.envelope_x, self.pending_x)),
+                np.concatenate((self.envelope_y, self.pending_y)))
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,475 @@
+"""Emerson gas-analyzer log reading and automatic H2 peak integration.
+
+Run headless over many logs in parallel:
+
+    python flow_integration.py logs/*.txt --skip 40 --out peaks.csv
+
+or follow a log that the analyzer is still writing, printing the running
+integral and every newly completed peak:
+
+    python flow_integration.py running.txt --follow --interval 5
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+EMERSON_COLUMNS = [
+    "Date", "Time",
+    "Ch1_ppm", "Ch1_Status",
+    "Ch2_ppm", "Ch2_Status",
+    "Ch3_ppm", "Ch3_Status",
+    "Ch4_ppm", "Ch4_Status"
+]
+HEADER_LINES = 8  # Lines before the first data row of an Emerson log
+
+
+def read_ch3_chunks(file_path, skip_minutes, chunksize=100000, datetime_format=None):
+    """Stream an Emerson log and yield (Timestamp, Time_h, Ch3_ppm) per chunk.
+
+    Only Date, Time and Ch3 are parsed, with the C engine. The timestamp format is
+    guessed once from the first row (or given as datetime_format) and then applied
+    to every chunk, and the skip_minutes cut is applied while streaming.
+    """
+    reader = pd.read_csv(
+        file_path,
+        sep="\t",
+        skiprows=HEADER_LINES,
+        header=None,
+        names=EMERSON_COLUMNS,
+        usecols=["Date", "Time", "Ch3_ppm"],
+        dtype=str,
+        engine="c",
+        chunksize=chunksize
+    )
+
+    start_time = None
+    skip_hours = skip_minutes / 60.0
+    for chunk in reader:
+        timestamps, ch3_ppm, datetime_format = _ch3_rows(chunk, datetime_format)
+        if timestamps is None:
+            continue
+        if start_time is None:
+            start_time = timestamps.iloc[0]
+        time_h = (timestamps - start_time).dt.total_seconds().to_numpy() / 3600
+
+        # Skip user-defined minutes
+        keep = time_h >= skip_hours
+        if keep.any():
+            yield timestamps[keep].to_numpy(), time_h[keep], ch3_ppm[keep]
+
+
+def _ch3_rows(chunk, datetime_format):
+    """Timestamps and Ch3 values of the rows of a chunk that have a numeric Ch3 reading.
+
+    The timestamp format is guessed from the first such row if it is not known
+    yet; returns (None, None, datetime_format) if no row has a reading.
+    """
+    ch3_ppm = pd.to_numeric(chunk["Ch3_ppm"], errors="coerce")
+    valid = ch3_ppm.notnull().to_numpy()
+    if not valid.any():
+        return None, None, datetime_format
+
+    timestamp_text = chunk["Date"][valid] + " " + chunk["Time"][valid]
+    if datetime_format is None:
+        datetime_format = guess_datetime_format(timestamp_text.iloc[0])
+    timestamps = pd.to_datetime(timestamp_text, format=datetime_format)
+    return timestamps, ch3_ppm.to_numpy()[valid], datetime_format
+
+
+def ppm_to_umol_per_h(ch3_ppm):
+    return (ch3_ppm * 100) / 407.5
+
+
+def trapezoid_area(y, x):
+    """Trapezoidal integral of y over x (same as np.trapz)."""
+    return float(np.sum((x[1:] - x[:-1]) * (y[1:] + y[:-1])) / 2) if len(x) > 1 else 0.0
+
+
+def process_file(file_path, skip_minutes, chunksize=100000):
+    """The Ch3 trace of one log as a table, with its total integral (µmol) in attrs["integrated_umol"].
+
+    The log is parsed in chunks of chunksize rows, but the chunks are joined
+    before integrating because peak detection needs the whole trace, so memory
+    use grows with the length of the log, not with chunksize.
+    """
+    chunks = list(read_ch3_chunks(file_path, skip_minutes, chunksize))
+    if not chunks:
+        raise ValueError(f"No Ch3 data left in {file_path} after skipping {skip_minutes} minutes")
+    timestamps, time_h, ch3_ppm = (np.concatenate(columns) for columns in zip(*chunks))
+    print(f"Skipped first {skip_minutes:.2f} minutes ({skip_minutes / 60.0:.3f} hours)")
+
+    df = pd.DataFrame({
+        "Timestamp": timestamps,
+        "Ch3_ppm": ch3_ppm,
+        "Time_h": time_h,
+        "Ch3_umol_per_h": ppm_to_umol_per_h(ch3_ppm)
+    })
+    df.attrs["integrated_umol"] = trapezoid_area(df["Ch3_umol_per_h"].to_numpy(), time_h)
+    return df
+
+def detect_peaks(y, distance=None):
+    """Indices of the H2 peaks in a trace (same criteria as the boundary editor).
+
+    Peaks are at least distance points apart, by default a fiftieth of the trace.
+    """
+    from scipy.signal import find_peaks
+    return find_peaks(
+        y,
+        height=np.percentile(y, 60),
+        distance=max(2, len(y) // 50) if distance is None else distance,
+        prominence=np.std(y) * 0.15,
+        width=1
+    )[0]
+
+
+def peak_boundaries(y, peaks, search_window=None):
+    """Left and right minima around every peak, found for all peaks at once.
+
+    The left boundary is the minimum of the search_window points before the peak,
+    the right boundary the minimum of the peak and the search_window points after it.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    peaks = np.asarray(peaks, dtype=np.intp)
+    if search_window is None:
+        search_window = min(20, len(y) // 10)
+    if search_window == 0 or len(peaks) == 0:
+        return np.maximum(peaks - 1, 0), peaks.copy()
+
+    # Pad with +inf so windows running off either end never pick a padded point
+    pad = np.full(search_window, np.inf)
+    padded = np.concatenate((pad, y, pad))
+    left_windows = sliding_window_view(padded, search_window)  # row p = y[p-w:p]
+    right_windows = sliding_window_view(padded, search_window + 1)  # row p+w = y[p:p+w+1]
+
+    left = peaks - search_window + np.argmin(left_windows[peaks], axis=1)
+    left = np.where(peaks == 0, 0, left)
+    right = peaks + np.argmin(right_windows[peaks + search_window], axis=1)
+    return left, right
+
+
+class PeakAreas:
+    """Baseline-corrected peak areas from prefix sums of the trapezoidal integral.
+
+    The baseline of a peak is the mean of its two boundary values, and the area
+    is the integral of the trace above it, clipped at zero. Since
+    max(y - b, 0) = (y - b) + max(b - y, 0), the area is the unclipped integral,
+    a difference of two prefix sums, plus the integral of the part below the
+    baseline. That correction is computed for all peaks in one vectorized pass
+    over their points, so each peak costs time proportional to its width.
+    """
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        segments = np.diff(self.x) * (self.y[1:] + self.y[:-1]) / 2
+        self.cumulative = np.concatenate(([0.0], np.cumsum(segments)))
+
+    def baseline(self, left, right):
+        return (self.y[left] + self.y[right]) / 2
+
+    def area(self, left, right):
+        """Area of one peak, or of many peaks if left and right are arrays."""
+        scalar = np.ndim(left) == 0
+        left = np.atleast_1d(np.asarray(left, dtype=np.intp))
+        right = np.atleast_1d(np.asarray(right, dtype=np.intp))
+        baseline = self.baseline(left, right)
+        area = self.cumulative[right] - self.cumulative[left] - baseline * (self.x[right] - self.x[left])
+        area += self._below_baseline(left, right, baseline)
+        return area[0] if scalar else area
+
+    def _below_baseline(self, left, right, baseline):
+        # Trapezoidal integral of max(baseline - y, 0) over every window, from
+        # one flat gather of all their segments
+        widths = np.maximum(right - left, 0)
+        peak = np.repeat(np.arange(len(left)), widths)
+        start = left[peak] + np.arange(len(peak)) - np.repeat(np.cumsum(widths) - widths, widths)
+        below = np.maximum(baseline[peak] - self.y[start], 0) + np.maximum(baseline[peak] - self.y[start + 1], 0)
+        segments = (self.x[start + 1] - self.x[start]) * below / 2
+        return np.bincount(peak, weights=segments, minlength=len(left))
+
+
+def integrate_peaks(x, y):
+    """Detect and integrate every peak of a trace; return one row per peak."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    peaks = detect_peaks(y)
+    left, right = peak_boundaries(y, peaks)
+    areas = PeakAreas(x, y)
+    return pd.DataFrame({
+        "peak_number": np.arange(1, len(peaks) + 1),
+        "time_h": x[peaks],
+        "value": y[peaks],
+        "left_h": x[left],
+        "right_h": x[right],
+        "left_idx": left,
+        "peak_idx": peaks,
+        "right_idx": right,
+        "baseline": areas.baseline(left, right),
+        "integration_umol": areas.area(left, right),
+    })
+
+
+def integrate_log(file_path, skip_minutes):
+    """Total and per-peak H2 integration of one Emerson log."""
+    df = process_file(file_path, skip_minutes)
+    peaks = integrate_peaks(df["Time_h"].to_numpy(), df["Ch3_umol_per_h"].to_numpy())
+    peaks.insert(0, "file", os.path.basename(file_path))
+    return df.attrs["integrated_umol"], peaks
+
+
+def _integrate_job(job):
+    # Worker entry point: report errors instead of raising, so one bad log does not stop the batch
+    file_path, skip_minutes = job
+    try:
+        return file_path, integrate_log(file_path, skip_minutes), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def integrate_logs(file_paths, skip_minutes, workers=None):
+    """Integrate many logs on a process pool.
+
+    Returns (totals, peaks, failures): one row per file, one row per peak, and
+    (file, error) pairs for logs that could not be processed.
+    """
+    totals, peak_tables, failures = [], [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [(file_path, skip_minutes) for file_path in file_paths]
+        for file_path, result, error in executor.map(_integrate_job, jobs):
+            if error is not None:
+                failures.append((file_path, error))
+                continue
+            total, peaks = result
+            label = os.path.basename(file_path)
+            totals.append({
+                "file": label,
+                "total_integration_umol": total,
+                "peak_count": len(peaks),
+                "peak_sum_umol": peaks["integration_umol"].sum(),
+                "remaining_umol": total - peaks["integration_umol"].sum(),
+            })
+            peak_tables.append(peaks)
+
+    peaks = pd.concat(peak_tables, ignore_index=True) if peak_tables else pd.DataFrame()
+    return pd.DataFrame(totals), peaks, failures
+
+
+class _GrowingArray:
+    """float64 array with amortized O(1) appends."""
+
+    def __init__(self, capacity=4096):
+        self._data = np.empty(capacity)
+        self._size = 0
+
+    def extend(self, values):
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)))
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    @property
+    def values(self):
+        return self._data[:self._size]
+
+    def __len__(self):
+        return self._size
+
+
+class LogTail:
+    """Follow an Emerson log that the analyzer is still writing.
+
+    poll() reads only the bytes appended since the previous call, parses the
+    complete new rows, adds them to the running H2 integral and looks for peaks
+    in the recent part of the trace only (the last context points, plus any
+    backlog such as a long log on its first poll), so a refresh costs the same
+    however long the log has grown. A peak is reported once, as soon as the points after it
+    cover its right boundary search; peaks are detected with the same criteria
+    as integrate_peaks(), applied to the recent window instead of the whole run.
+    Like those criteria on a flat log, they can flag noise while the window
+    holds nothing but baseline.
+    """
+
+    def __init__(self, file_path, skip_minutes=0.0, context=20000, search_window=20):
+        self.file_path = file_path
+        self.skip_hours = skip_minutes / 60.0
+        self.context = context
+        self.search_window = search_window
+        self.reset()
+
+    def reset(self):
+        self.offset = 0  # Bytes of the file consumed so far
+        self.partial = b""  # Last line of the previous read if it was not complete yet
+        self.header_lines_left = HEADER_LINES
+        self.datetime_format = None
+        self.start_time = None
+        self.integrated_umol = 0.0
+        self.peaks = []  # One dict per completed peak, with the columns of integrate_peaks()
+        self._time_h = _GrowingArray()
+        self._umol_per_h = _GrowingArray()
+        self._searched_until = -1  # New peaks must lie after the right boundary of the last one
+        self._window_start = 0  # Oldest point the next peak search has to cover
+
+    @property
+    def time_h(self):
+        return self._time_h.values
+
+    @property
+    def umol_per_h(self):
+        return self._umol_per_h.values
+
+    def __len__(self):
+        return len(self._time_h)
+
+    def poll(self):
+        """Read the rows appended since the last poll; returns (number of new points, new peaks)."""
+        size = os.path.getsize(self.file_path)
+        if size < self.offset:
+            # The log was truncated or replaced by a new run: start over
+            self.reset()
+        if size == self.offset:
+            return 0, []
+        with open(self.file_path, "rb") as file:
+            file.seek(self.offset)
+            data = self.partial + file.read(size - self.offset)
+        self.offset = size
+
+        # Parse complete lines only; an unfinished last line waits for the next poll
+        end = data.rfind(b"\n") + 1
+        data, self.partial = data[:end], data[end:]
+        while self.header_lines_left and data:
+            data = data[data.find(b"\n") + 1:]
+            self.header_lines_left -= 1
+        if not data.strip():
+            return 0, []
+
+        chunk = pd.read_csv(io.BytesIO(data), sep="\t", header=None, names=EMERSON_COLUMNS,
+                            usecols=["Date", "Time", "Ch3_ppm"], dtype=str, engine="c")
+        timestamps, ch3_ppm, self.datetime_format = _ch3_rows(chunk, self.datetime_format)
+        if timestamps is None:
+            return 0, []
+        if self.start_time is None:
+            self.start_time = timestamps.iloc[0]
+        time_h = (timestamps - self.start_time).dt.total_seconds().to_numpy() / 3600
+
+        # Skip user-defined minutes
+        keep = time_h >= self.skip_hours
+        time_h, umol_per_h = time_h[keep], ppm_to_umol_per_h(ch3_ppm[keep])
+        if len(time_h) == 0:
+            return 0, []
+
+        if len(self._time_h):
+            # Carry the last point over so the interval between polls is counted too
+            self.integrated_umol += trapezoid_area(np.concatenate(([self.umol_per_h[-1]], umol_per_h)),
+                                                   np.concatenate(([self.time_h[-1]], time_h)))
+        else:
+            self.integrated_umol += trapezoid_area(umol_per_h, time_h)
+        self._time_h.extend(time_h)
+        self._umol_per_h.extend(umol_per_h)
+        return len(time_h), self._find_new_peaks()
+
+    def _find_new_peaks(self):
+        start = max(min(self._window_start, len(self) - self.context), 0)
+        self._window_start = len(self) - self.context
+        x = self.time_h[start:]
+        y = self.umol_per_h[start:]
+        if len(y) < 3:
+            return []
+
+        # The peak spacing follows the full window, so short early traces do not split peaks into noise
+        peaks = detect_peaks(y, distance=max(2, self.context // 50))
+        # Only peaks after the last reported one whose right boundary search window is complete
+        peaks = peaks[(peaks + start > self._searched_until) & (peaks + self.search_window < len(y))]
+        if len(peaks) == 0:
+            return []
+        left, right = peak_boundaries(y, peaks, self.search_window)
+        areas = PeakAreas(x, y)
+        baseline = areas.baseline(left, right)
+        integration = areas.area(left, right)
+
+        new_peaks = []
+        for i in range(len(peaks)):
+            new_peaks.append({
+                "peak_number": len(self.peaks) + i + 1,
+                "time_h": x[peaks[i]],
+                "value": y[peaks[i]],
+                "left_h": x[left[i]],
+                "right_h": x[right[i]],
+                "left_idx": start + int(left[i]),
+                "peak_idx": start + int(peaks[i]),
+                "right_idx": start + int(right[i]),
+                "baseline": baseline[i],
+                "integration_umol": integration[i],
+            })
+        self._searched_until = start + int(right[-1])
+        self.peaks.extend(new_peaks)
+        return new_peaks
+
+
+def follow_log(file_path, skip_minutes, interval=5.0):
+    """Print the running integral and every new peak of a growing log until interrupted."""
+    tail = LogTail(file_path, skip_minutes)
+    print(f"Following {file_path} every {interval:g} s (Ctrl+C to stop)")
+    try:
+        while True:
+            new_points, new_peaks = tail.poll()
+            for peak in new_peaks:
+                print(f"Peak {peak['peak_number']}: {peak['integration_umol']:.2f} µmol at {peak['time_h']:.2f} h")
+            if new_points:
+                print(f"{len(tail)} points, {tail.time_h[-1]:.2f} h, integrated {tail.integrated_umol:.2f} µmol")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    return tail
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Integrate H2 peaks in Emerson logs without the GUI.")
+    parser.add_argument("logs", nargs="+", help="log files or glob patterns")
+    parser.add_argument("--skip", type=float, default=40.0, help="minutes to skip from the start (default: 40)")
+    parser.add_argument("--out", default="peak_integration.csv", help="per-peak output CSV")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--follow", action="store_true", help="follow one log that is still being written")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between reads with --follow (default: 5)")
+    args = parser.parse_args(argv)
+
+    if args.follow:
+        if len(args.logs) != 1:
+            parser.error("--follow takes exactly one log file")
+        tail = follow_log(args.logs[0], args.skip, args.interval)
+        if tail.peaks:
+            pd.DataFrame(tail.peaks).to_csv(args.out, index=False)
+            print(f"Peak table saved to {args.out}")
+        return 0
+
+    file_paths = sorted({path for pattern in args.logs for path in (glob.glob(pattern) or [pattern])})
+    totals, peaks, failures = integrate_logs(file_paths, args.skip, args.workers)
+    for file_path, error in failures:
+        print(f"Error processing {file_path}: {error}")
+    if totals.empty:
+        return 1
+
+    peaks.to_csv(args.out, index=False)
+    totals_path = os.path.splitext(args.out)[0] + "_totals.csv"
+    totals.to_csv(totals_path, index=False)
+    print(totals.to_string(index=False))
+    print(f"Peak table saved to {args.out}, totals to {totals_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
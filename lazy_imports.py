@@ -0,0 +1,38 @@
+import importlib
+import threading
+
+# Heavy optional dependencies are imported inside the functions that use them.
+# The GUIs call preload() once their window is up, so by the time the user
+# asks for a baseline, a DTG curve or a structure the import has already
+# happened in the background and the first use does not stall.
+
+_threads = []
+
+
+def preload(*module_names):
+    """Import module_names on a daemon thread and return the thread.
+
+    Import errors are swallowed here: a missing module is reported where it
+    is actually used, as it would be without preloading.
+    """
+    def run():
+        for name in module_names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    _threads.append(thread)
+    thread.start()
+    return thread
+
+
+def wait():
+    """Block until every preload started so far has finished.
+
+    Call this before starting a process pool: a process forked while a
+    preload holds an import lock deadlocks on its first import of that module.
+    """
+    while _threads:
+        _threads.pop().join()
@@ -0,0 +1,268 @@
+"""Labelled structure images for whole compound libraries.
+
+Reads name + structure rows from a CSV (SMILES or InChI column) or an SDF,
+renders them on a process pool and keeps every PNG in a cache keyed by
+canonical SMILES, image size and label, so a structure that was drawn once
+is never drawn again. Optionally tiles the images into grid sheets:
+
+    python molecules.py compounds.csv --out panels --grid 5x6
+    python molecules.py library.sdf --name-field NAME --size 300 --export
+"""
+import argparse
+import functools
+import hashlib
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+
+# rdkit is imported where molecules are parsed and drawn, so reading the
+# input and assembling sheets does not load it
+
+NAME_COLUMNS = ("name", "compound", "label", "id")
+STRUCTURE_COLUMNS = ("smiles", "inchi", "structure")
+FONT_FILE = "arial.ttf"
+FONT_SIZE = 20
+INDEX_COLUMNS = ["name", "structure", "canonical_smiles", "image", "cached", "error"]
+
+
+def structure_format(text):
+    return "InChI" if text.startswith("InChI=") else "SMILES"
+
+
+def parse_structure(text, mol_format):
+    """RDKit molecule from a SMILES, InChI or MolBlock string (None if it cannot be parsed)."""
+    from rdkit import Chem
+
+    mol_format = mol_format.upper()
+    if mol_format == "SMILES":
+        return Chem.MolFromSmiles(text)
+    if mol_format == "INCHI":
+        return Chem.MolFromInchi(text)
+    if mol_format == "MOLBLOCK":
+        return Chem.MolFromMolBlock(text)
+    raise ValueError(f"Unknown structure format {mol_format!r}. Use 'SMILES' or 'InChI'.")
+
+
+@functools.lru_cache(maxsize=None)
+def label_font(size=FONT_SIZE):
+    """Label font, loaded once per process; Pillow's default font where Arial is not installed."""
+    try:
+        return ImageFont.truetype(FONT_FILE, size)
+    except OSError:
+        try:
+            return ImageFont.load_default(size=size)
+        except TypeError:  # Pillow < 10.1 has no scalable default font
+            return ImageFont.load_default()
+
+
+def render_molecule(mol, name, size=(400, 400)):
+    """Draw mol as an RGBA image with name centered at the top."""
+    from rdkit.Chem import Draw
+
+    img = Draw.MolToImage(mol, size=size).convert("RGBA")
+    if name:
+        draw = ImageDraw.Draw(img)
+        font = label_font()
+        bbox = draw.textbbox((0, 0), name, font=font)
+        text_position = ((img.size[0] - (bbox[2] - bbox[0])) // 2, 10)  # Centered at top
+        draw.text(text_position, name, fill="black", font=font)
+    return img
+
+
+class ImageCache:
+    """Folder of rendered PNGs named by a hash of canonical SMILES, image size and label."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, canonical_smiles, size, label):
+        key = f"{canonical_smiles}\0{size[0]}x{size[1]}\0{label}"
+        return os.path.join(self.folder, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def render(self, mol, label, size):
+        """Path of the cached image of mol, drawing it only on a cache miss; returns (path, was_cached)."""
+        from rdkit import Chem
+
+        path = self.path(Chem.MolToSmiles(mol), size, label)
+        if os.path.exists(path):
+            return path, True
+        # Write under a private name first: workers may render the same structure at the same time
+        temporary = f"{path}.{os.getpid()}.tmp"
+        render_molecule(mol, label, size).save(temporary, format="PNG")
+        os.replace(temporary, path)
+        return path, False
+
+
+def read_structures(file_path, name_column=None, structure_column=None):
+    """(name, structure, format) rows of a CSV or SDF compound list.
+
+    CSV columns are found by name (case-insensitive) unless given; each
+    structure may be SMILES or InChI. SDF records are passed on as MolBlocks
+    named by their title line or by the name_column data field.
+    """
+    if file_path.lower().endswith(".sdf"):
+        return _read_sdf(file_path, name_column)
+
+    table = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+    name_column = name_column or _find_column(table.columns, NAME_COLUMNS)
+    structure_column = structure_column or _find_column(table.columns, STRUCTURE_COLUMNS)
+    if structure_column is None:
+        raise ValueError(f"No structure column in {file_path}; expected one of {STRUCTURE_COLUMNS}.")
+    names = table[name_column] if name_column is not None else pd.Series([""] * len(table))
+    return [(name.strip(), structure.strip(), structure_format(structure.strip()))
+            for name, structure in zip(names, table[structure_column])]
+
+
+def _find_column(columns, candidates):
+    lookup = {column.strip().lower(): column for column in columns}
+    return next((lookup[candidate] for candidate in candidates if candidate in lookup), None)
+
+
+def _read_sdf(file_path, name_field=None):
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        records = re.split(r'^\$\$\$\$[ \t\r]*\n?', file.read(), flags=re.MULTILINE)
+    field = re.compile(rf'^>\s*<{re.escape(name_field)}>.*\n(.*)$', re.MULTILINE) if name_field else None
+    # The split consumes the newline after "$$$$", so each record starts at its
+    # title line, which may be blank; only the empty tail after the last "$$$$" is dropped
+    if records and not records[-1].strip():
+        records.pop()
+    rows = []
+    for record in records:
+        match = field.search(record) if field else None
+        title = record.splitlines()[0].strip() if record else ""
+        name = match.group(1).strip() if match else title
+        rows.append((name, record, "MolBlock"))
+    return rows
+
+
+def _init_worker():
+    from rdkit import RDLogger
+    RDLogger.DisableLog("rdApp.*")  # Unparsable rows are reported in the index instead
+
+
+def _render_job(job):
+    # Worker entry point: report errors instead of raising, so one bad structure does not stop the batch
+    (name, structure, mol_format), cache_dir, size = job
+    try:
+        mol = parse_structure(structure, mol_format)
+        if mol is None:
+            return None, None, None, "invalid structure"
+        from rdkit import Chem
+        path, cached = ImageCache(cache_dir).render(mol, name, size)
+        return Chem.MolToSmiles(mol), path, cached, None
+    except Exception as e:
+        return None, None, None, str(e)
+
+
+def render_batch(rows, cache_dir, size=(400, 400), workers=None, chunksize=16):
+    """Render (name, structure, format) rows into the cache and return the index table.
+
+    The table has one row per input row, with the cached image path.
+    Identical rows are rendered once. With workers=1 everything runs in this
+    process; otherwise on a process pool where each worker loads the label
+    font once.
+    """
+    unique = list(dict.fromkeys(rows))
+    jobs = [(row, cache_dir, tuple(size)) for row in unique]
+    if workers == 1:
+        _init_worker()
+        results = list(map(_render_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            results = list(executor.map(_render_job, jobs, chunksize=chunksize))
+
+    # SDF records are listed by name and canonical SMILES only, without their MolBlock
+    by_row = dict(zip(unique, results))
+    return pd.DataFrame([(name, None if mol_format == "MolBlock" else structure) + by_row[(name, structure, mol_format)]
+                         for name, structure, mol_format in rows], columns=INDEX_COLUMNS)
+
+
+def make_sheets(image_paths, out_prefix, columns=5, rows=6):
+    """Tile images into columns x rows sheets (<out_prefix>_001.png, ...); returns the sheet paths."""
+    image_paths = [path for path in image_paths if isinstance(path, str)]
+    per_sheet = columns * rows
+    tiles = {}  # Each cached image is decoded once, however often it appears
+    sheets = []
+    for number, start in enumerate(range(0, len(image_paths), per_sheet), start=1):
+        page = image_paths[start:start + per_sheet]
+        for path in page:
+            if path not in tiles:
+                with Image.open(path) as tile:
+                    tiles[path] = tile.convert("RGB")
+        width, height = tiles[page[0]].size
+        sheet = Image.new("RGB", (columns * width, ((len(page) - 1) // columns + 1) * height), "white")
+        for i, path in enumerate(page):
+            sheet.paste(tiles[path], ((i % columns) * width, (i // columns) * height))
+        sheet_path = f"{out_prefix}_{number:03d}.png"
+        sheet.save(sheet_path)
+        sheets.append(sheet_path)
+    return sheets
+
+
+def export_images(index, folder):
+    """Copy the cached images of the index into folder as <name>.png.
+
+    Each image is copied once per name; a name that belongs to several
+    structures gets the row number appended, unnamed rows are molecule_<row>.
+    """
+    os.makedirs(folder, exist_ok=True)
+    exported = {}  # file name -> cached image
+    for number, (name, path) in enumerate(zip(index["name"], index["image"]), start=1):
+        if not isinstance(path, str):
+            continue
+        file_name = re.sub(r'[^\w.-]+', '_', name).strip('_') or f"molecule_{number}"
+        if exported.get(file_name, path) != path:
+            file_name = f"{file_name}_{number}"
+        if file_name not in exported:
+            shutil.copyfile(path, os.path.join(folder, file_name + ".png"))
+            exported[file_name] = path
+
+
+def _grid(text):
+    match = re.fullmatch(r'([1-9]\d*)x([1-9]\d*)', text)
+    if not match:
+        raise argparse.ArgumentTypeError("grid must be COLUMNSxROWS, e.g. 5x6")
+    return int(match.group(1)), int(match.group(2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render labelled structure images for a compound list.")
+    parser.add_argument("input", help="CSV with a name and a SMILES/InChI column, or an SDF")
+    parser.add_argument("--out", default="molecule_images", help="output folder (default: molecule_images)")
+    parser.add_argument("--cache", default="molecule_cache", help="image cache folder (default: molecule_cache)")
+    parser.add_argument("--size", type=int, default=400, help="image width and height in pixels (default: 400)")
+    parser.add_argument("--name-field", help="CSV column or SDF data field holding the compound name")
+    parser.add_argument("--structure-column", help="CSV column holding the SMILES or InChI")
+    parser.add_argument("--grid", type=_grid, help="also tile the images into COLUMNSxROWS sheets")
+    parser.add_argument("--export", action="store_true", help="also copy each image to <out>/images/<name>.png")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    rows = read_structures(args.input, args.name_field, args.structure_column)
+    index = render_batch(rows, args.cache, (args.size, args.size), args.workers)
+    for row, name, structure, error in index.loc[index["error"].notna(), ["name", "structure", "error"]].itertuples():
+        # SDF records are listed without their MolBlock, so an unnamed one is shown by its position
+        print(f"Error rendering {name or (structure or f'record {row + 1}')[:40]!r}: {error}")
+
+    os.makedirs(args.out, exist_ok=True)
+    index_path = os.path.join(args.out, "molecules.csv")
+    index.to_csv(index_path, index=False)
+    rendered = index["image"].notna()
+    print(f"{rendered.sum()} of {len(index)} structures rendered ({index['cached'].eq(True).sum()} from cache)")
+    print(f"Index saved to {index_path}")
+    if args.export:
+        export_images(index, os.path.join(args.out, "images"))
+    if args.grid:
+        sheets = make_sheets(index["image"].tolist(), os.path.join(args.out, "sheet"), *args.grid)
+        print(f"{len(sheets)} sheets saved to {args.out}")
+    return 0 if rendered.any() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
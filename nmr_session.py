@@ -0,0 +1,131 @@
+import functools
+import glob
+import os
+
+import numpy as np
+
+from decimation import MinMaxPyramid
+
+
+class BrukerSpectrum:
+    """A processed 1D Bruker spectrum (pdata/<n>/1r), memory-mapped from disk.
+
+    Nothing is copied into memory up front: the ppm axis is computed from
+    SW_p/SF/OFFSET for the points actually requested, and intensities are read
+    and scaled only for the visible slice. Zoomed-out views come from the coarse
+    levels of a min/max pyramid, built by reading the file once in chunks.
+    """
+
+    def __init__(self, pdata_dir):
+        import nmrglue as ng  # Deferred so the viewer window opens before nmrglue is loaded
+
+        self.pdata_dir = pdata_dir
+        procs = ng.bruker.read_jcamp(os.path.join(pdata_dir, "procs"))
+        self.sw = float(procs["SW_p"])  # Spectral width (Hz)
+        self.sf = float(procs["SF"])  # Spectrometer frequency (MHz)
+        self.offset = float(procs.get("OFFSET", self.sw / self.sf))  # ppm of the first point
+        self.scale = 2.0 ** float(procs.get("NC_proc", 0))
+
+        byte_order = ">" if procs.get("BYTORDP", 0) == 1 else "<"
+        dtype = "f8" if procs.get("DTYPP", 0) == 2 else "i4"
+        self.data = np.memmap(os.path.join(pdata_dir, "1r"), dtype=byte_order + dtype, mode="r")
+        self.size = len(self.data)
+        self.ppm_per_point = self.sw / self.sf / self.size
+        self._range = None
+
+    @property
+    def name(self):
+        # .../<sample>/<expno>/pdata/<procno> -> "<sample>/<expno>"
+        expno_dir = os.path.dirname(os.path.dirname(os.path.abspath(self.pdata_dir)))
+        return os.path.join(os.path.basename(os.path.dirname(expno_dir)), os.path.basename(expno_dir))
+
+    def ppm(self, index):
+        """Chemical shift (ppm) of one point index or an array of indices."""
+        return self.offset - np.asarray(index) * self.ppm_per_point
+
+    def index_range(self, ppm_a, ppm_b):
+        """Slice bounds of the points between two chemical shifts, clipped to the spectrum."""
+        low, high = sorted((ppm_a, ppm_b))
+        start = int(np.floor((self.offset - high) / self.ppm_per_point))
+        stop = int(np.ceil((self.offset - low) / self.ppm_per_point)) + 1
+        return max(start, 0), min(max(stop, 0), self.size)
+
+    def intensity_range(self):
+        """Min and max intensity, read once from the mapped file."""
+        if self._range is None:
+            self._range = (float(self.data.min()) * self.scale, float(self.data.max()) * self.scale)
+        return self._range
+
+    @functools.cached_property
+    def pyramid(self):
+        """Min/max pyramid of the raw mapped intensities; only its coarse levels are held in memory."""
+        return MinMaxPyramid(self.data)
+
+    def view(self, ppm_a, ppm_b, pixels=None):
+        """Return ppm/intensity of the visible window, decimated to about pixels if given."""
+        start, stop = self.index_range(ppm_a, ppm_b)
+        if pixels is None:
+            index, values = np.arange(start, stop), self.data[start:stop]
+        else:
+            index, values = self.pyramid.view(start, stop, pixels)
+        return self.ppm(index), values * self.scale
+
+
+def find_pdata_dirs(folder):
+    """All processed-data directories containing a 1r file below folder."""
+    if os.path.isfile(os.path.join(folder, "1r")):
+        return [folder]
+    return sorted(os.path.dirname(path) for path in glob.glob(os.path.join(folder, "**", "1r"), recursive=True))
+
+
+class NMRSession:
+    """A list of memory-mapped spectra drawn together in overlay or stacked mode.
+
+    All spectra share one axes, so zoom and pan act on every spectrum at once;
+    refresh() re-slices only the visible window after each view change.
+    """
+
+    def __init__(self):
+        self.spectra = []
+        self.lines = []
+        self.mode = "overlay"
+        self.stack_offset = 0.5  # Fraction of the largest intensity between stacked spectra
+
+    def add(self, pdata_dir):
+        spectrum = BrukerSpectrum(pdata_dir)
+        self.spectra.append(spectrum)
+        return spectrum
+
+    def clear(self):
+        self.spectra = []
+        self.lines = []
+
+    def offsets(self):
+        """Vertical offset of each spectrum for the current display mode."""
+        if self.mode != "stacked":
+            return [0.0] * len(self.spectra)
+        step = self.stack_offset * max(spectrum.intensity_range()[1] for spectrum in self.spectra)
+        return [i * step for i in range(len(self.spectra))]
+
+    def intensity_limits(self):
+        """y-limits that fit every spectrum, including stacking offsets."""
+        ranges = [spectrum.intensity_range() for spectrum in self.spectra]
+        offsets = self.offsets()
+        low = min(r[0] + o for r, o in zip(ranges, offsets))
+        high = max(r[1] + o for r, o in zip(ranges, offsets))
+        return low * 0.9 if low > 0 else low * 1.1, high * 1.1
+
+    def draw(self, ax, colors, linewidth=0.8):
+        """Create one (empty) line per spectrum on ax; refresh() fills them in."""
+        self.lines = []
+        for i, spectrum in enumerate(self.spectra):
+            label = spectrum.name if len(self.spectra) > 1 else None
+            line, = ax.plot([], [], color=colors[i % len(colors)], linewidth=linewidth, label=label)
+            self.lines.append(line)
+        return self.lines
+
+    def refresh(self, xlim, pixels):
+        """Load only the points inside xlim into every line, at about screen resolution."""
+        for spectrum, line, offset in zip(self.spectra, self.lines, self.offsets()):
+            ppm, intensity = spectrum.view(xlim[0], xlim[1], pixels)
+            line.set_data(ppm, intensity + offset)
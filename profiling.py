@@ -0,0 +1,95 @@
+import functools
+import os
+import sys
+import time
+from collections import defaultdict
+
+# Set DATA_EXTRACTING_PROFILE=1 to log per-stage timings from the GUIs
+ENV_VAR = "DATA_EXTRACTING_PROFILE"
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+_depth = 0
+timings = []  # (stage, seconds) of every finished stage, in order
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+class _Stage:
+    """Times one stage and prints it, indented under the enclosing stage."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        global _depth
+        self.depth = _depth
+        _depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _depth
+        seconds = time.perf_counter() - self.start
+        _depth -= 1
+        timings.append((self.name, seconds))
+        print(f"[profile] {'  ' * self.depth}{self.name}: {seconds * 1000:.1f} ms", file=sys.stderr)
+        return False
+
+
+class _NoStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Context manager that times a block when profiling is on and does nothing otherwise."""
+    return _Stage(name) if _enabled else _NO_STAGE
+
+
+def timed(name=None):
+    """Decorator form of stage(); the stage name defaults to the function name."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def time_draws(fig, name="draw"):
+    """Time every redraw of a matplotlib figure as a stage (only while profiling is on)."""
+    if not _enabled:
+        return fig
+    draw = fig.draw
+
+    @functools.wraps(draw)
+    def timed_draw(renderer):
+        with stage(name):
+            return draw(renderer)
+    fig.draw = timed_draw
+    return fig
+
+
+def summary():
+    """Total time and call count per stage name, slowest first."""
+    totals = defaultdict(lambda: [0.0, 0])
+    for name, seconds in timings:
+        totals[name][0] += seconds
+        totals[name][1] += 1
+    return sorted(((name, total, count) for name, (total, count) in totals.items()), key=lambda row: -row[1])
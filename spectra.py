@@ -0,0 +1,423 @@
+import functools
+import os
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# scipy and matplotlib are imported inside the functions that need them, so
+# tools that only parse spectra start without loading either
+
+
+def parse_xrd_file(filename):
+    """Parse an XRD export (.tsv, .xy or "[Scan points]" text) into Angle/Intensity columns."""
+    if filename.endswith(".tsv"):
+        data = pd.read_csv(filename, sep='\t', header=None, names=["Angle", "Intensity"])
+    elif filename.endswith(".xy"):
+        data = pd.read_csv(filename, sep=r'\s+', header=None, names=["Angle", "Intensity"])
+    else:
+        data = load_scan_points(filename)
+
+    # Ensure data contains no NaNs
+    data = data.dropna()
+
+    return data
+
+
+def parse_ftir_file(filename):
+    """Parse a whitespace-separated FTIR export into Wavenumber/Transmittance columns."""
+    data = pd.read_csv(filename, sep=r'\s+', header=None)
+    wavenumber = data.iloc[:, 0]
+    transmittance = data.iloc[:, 1]
+    return pd.DataFrame({'Wavenumber': wavenumber, 'Transmittance': transmittance})
+
+
+def _is_scan_point(line):
+    """Return True if line is a row the "[Scan points]" parser accepts."""
+    parts = line.strip().split(',')
+    if len(parts) < 4:
+        return False
+    try:
+        float(parts[0])
+        float(parts[2])
+    except ValueError:
+        return False
+    return True
+
+
+def load_scan_points(filename):
+    """Load Angle/Intensity from a "[Scan points]" export in one C-level pass.
+
+    The header is sniffed line by line up to the first numeric row, then the
+    whole block is handed to the pandas C parser. Blocks that are not a clean
+    comma-separated table (short rows, junk lines, missing values) fall back
+    to the row-by-row parser so the result is always identical to it.
+    """
+    with open(filename, 'r') as file:
+        # Find the "[Scan points]" marker without reading the rest of the file
+        line = file.readline()
+        while line and "[Scan points]" not in line:
+            line = file.readline()
+        if not line:
+            raise ValueError(f"No scan points found in {filename}. Please check the file format.")
+
+        # Skip column headers and blank lines up to the first numeric row
+        data_start = file.tell()
+        line = file.readline()
+        while line and not _is_scan_point(line):
+            data_start = file.tell()
+            line = file.readline()
+        if not line:
+            raise ValueError(f"No valid data found in {filename}.")
+
+        # Column 3 is read only so that rows with fewer than four fields show up as NaN
+        file.seek(data_start)
+        try:
+            block = pd.read_csv(
+                file,
+                header=None,
+                usecols=(0, 2, 3),
+                dtype=np.float64,
+                float_precision="round_trip",
+                engine="c",
+            )
+        except (ValueError, pd.errors.ParserError):
+            block = None
+
+    # Any gap means a row the line parser would have treated differently
+    if block is None or block.isna().any().any():
+        return _parse_scan_points_loop(filename, data_start)
+
+    return pd.DataFrame({"Angle": block[0].to_numpy(), "Intensity": block[2].to_numpy()})
+
+
+def _parse_scan_points_loop(filename, data_start=0):
+    """Row-by-row "[Scan points]" parser, starting at file position data_start."""
+    with open(filename, 'r') as file:
+        file.seek(data_start)
+        lines = file.readlines()
+
+    data = []
+    for line in lines:
+        line = line.strip()
+        if re.match(r'^\s*$', line):  # Skip empty lines
+            continue
+        parts = line.split(',')
+        if len(parts) >= 4:
+            try:
+                angle = float(parts[0])
+                intensity = float(parts[2])
+                data.append((angle, intensity))
+            except ValueError:
+                continue
+
+    if not data:
+        raise ValueError(f"No valid data found in {filename}.")
+
+    return pd.DataFrame(data, columns=["Angle", "Intensity"])
+
+
+@functools.lru_cache(maxsize=16)
+def _second_difference_bands(length):
+    """Upper banded form of D @ D.T, the ALS second-difference penalty, for one length."""
+    if length < 3:
+        raise ValueError("Baseline correction needs at least 3 points.")
+    from scipy import sparse
+    D = sparse.diags([1.0, -2.0, 1.0], [0, -1, -2], shape=(length, length - 2))
+    penalty = (D @ D.T).tocsr()
+    bands = np.zeros((3, length))
+    bands[0, 2:] = penalty.diagonal(2)
+    bands[1, 1:] = penalty.diagonal(1)
+    bands[2] = penalty.diagonal(0)
+    bands.setflags(write=False)
+    return bands
+
+
+def als_baseline_correction_batch(intensities, lam=1e5, p=0.01, niter=10):
+    """Subtract an asymmetric least squares baseline from a stack of equal-length patterns.
+
+    intensities is a 2D array (patterns x points). All patterns are solved together
+    as one block-diagonal banded system with a Cholesky solver, and the iteration
+    stops as soon as no weight changes.
+    """
+    from scipy.linalg import solveh_banded
+
+    intensities = np.asarray(intensities, dtype=np.float64)
+    if intensities.ndim != 2:
+        raise ValueError("Intensity stack must be 2D (patterns x points) for baseline correction.")
+
+    count, length = intensities.shape
+    y = intensities.ravel()
+
+    # Tiling keeps the blocks independent: the band slots that would couple the
+    # last points of one pattern to the first of the next are zero in the penalty.
+    ab = np.tile(lam * _second_difference_bands(length), count)
+    penalty_diagonal = ab[2].copy()
+
+    w = np.ones(y.size)
+    for i in range(niter):
+        ab[2] = penalty_diagonal + w
+        baseline = solveh_banded(ab, w * y, check_finite=False)
+        new_w = np.where(y > baseline, p, 1 - p)
+        if np.array_equal(new_w, w):
+            break
+        w = new_w
+
+    return (y - baseline).reshape(count, length)
+
+
+def als_baseline_correction(intensity, lam=1e5, p=0.01, niter=10):
+    """Subtract an asymmetric least squares baseline from a single 1D pattern."""
+    intensity = np.asarray(intensity, dtype=np.float64)
+    if len(intensity.shape) > 1:
+        raise ValueError("Intensity data must be 1D for baseline correction.")
+    return als_baseline_correction_batch(intensity[np.newaxis, :], lam, p, niter)[0]
+
+
+def apply_savgol_filter(intensity, window_length, polyorder):
+    """Smooth intensity with a Savitzky-Golay filter, rounding window_length up to odd."""
+    if window_length % 2 == 0:
+        window_length += 1
+    if window_length <= polyorder:
+        raise ValueError("Window length must be greater than polynomial order.")
+    if window_length > len(intensity):
+        raise ValueError(f"Window length ({window_length}) is larger than data length ({len(intensity)}).")
+    from scipy.signal import savgol_filter
+    return savgol_filter(intensity, window_length=window_length, polyorder=polyorder)
+
+
+class SpectrumCache:
+    """In-memory LRU cache of parsed spectra, keyed by file path, mtime and size.
+
+    Each entry keeps the parsed columns as read-only float64 arrays, so a file is
+    parsed once per session and re-parsed only when it changes on disk.
+    """
+
+    def __init__(self, loader, max_bytes=256 * 1024 * 1024):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (mtime, size, columns, nbytes)
+        self._nbytes = 0
+
+    def get(self, filename):
+        """Return the parsed spectrum for filename as a DataFrame."""
+        columns = self.get_arrays(filename)
+        return pd.DataFrame(columns, copy=False)
+
+    def get_arrays(self, filename):
+        """Return the parsed spectrum for filename as a dict of column name -> array."""
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+
+        entry = self._entries.get(path)
+        if entry is not None:
+            mtime, size, columns, _ = entry
+            if mtime == stat.st_mtime_ns and size == stat.st_size:
+                self._entries.move_to_end(path)
+                return columns
+            self._drop(path)
+
+        data = self.loader(filename)
+        columns = {}
+        for name in data.columns:
+            values = np.ascontiguousarray(data[name].to_numpy(dtype=np.float64))
+            values.setflags(write=False)
+            columns[name] = values
+        nbytes = sum(values.nbytes for values in columns.values())
+
+        self._entries[path] = (stat.st_mtime_ns, stat.st_size, columns, nbytes)
+        self._nbytes += nbytes
+        self._evict()
+        return columns
+
+    def invalidate(self, filename=None):
+        """Drop one file from the cache, or everything if no filename is given."""
+        if filename is None:
+            self._entries.clear()
+            self._nbytes = 0
+        else:
+            self._drop(os.path.abspath(filename))
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._nbytes -= entry[3]
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the cap
+        while self._nbytes > self.max_bytes and len(self._entries) > 1:
+            path = next(iter(self._entries))
+            self._drop(path)
+
+    def __contains__(self, filename):
+        return os.path.abspath(filename) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SpectrumStack:
+    """N spectra on one common x axis, kept as a single contiguous float64 matrix.
+
+    Row i of intensities is spectrum i; points outside a spectrum's measured
+    range are NaN. labels, colors and sources hold per-spectrum metadata.
+    Windowing, baseline correction, smoothing, normalization and offsets act on
+    the whole matrix at once and return a new stack, and plot() draws every
+    spectrum with one LineCollection.
+    """
+
+    def __init__(self, x, intensities, labels=None, colors=None, sources=None):
+        self.x = np.ascontiguousarray(x, dtype=np.float64)
+        intensities = np.ascontiguousarray(intensities, dtype=np.float64)
+        if len(self.x):
+            self.intensities = intensities.reshape(-1, len(self.x))
+        else:
+            # reshape(-1, 0) is ambiguous: keep the rows of a 2D input, e.g. a window without points
+            self.intensities = intensities.reshape(len(intensities) if intensities.ndim == 2 else 0, 0)
+        count = len(self.intensities)
+        self.labels = list(labels) if labels is not None else [str(i) for i in range(count)]
+        self.colors = list(colors) if colors is not None else [None] * count
+        self.sources = list(sources) if sources is not None else [None] * count
+
+    @classmethod
+    def from_curves(cls, curves, labels=None, colors=None, sources=None, max_points=1000000):
+        """Stack (x, y) curves, interpolating onto a common grid if their x axes differ.
+
+        Curves that already share one x axis are stacked as they are. Otherwise
+        the grid spans all curves with the finest median point spacing among them.
+        """
+        curves = [(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)) for x, y in curves]
+        curves = [(x[::-1], y[::-1]) if len(x) > 1 and x[0] > x[-1] else (x, y) for x, y in curves]
+        if not curves:
+            return cls(np.empty(0), np.empty((0, 0)), labels, colors, sources)
+
+        first_x = curves[0][0]
+        if all(len(x) == len(first_x) and np.array_equal(x, first_x) for x, _ in curves):
+            return cls(first_x, np.vstack([y for _, y in curves]), labels, colors, sources)
+
+        low = min(x[0] for x, _ in curves if len(x))
+        high = max(x[-1] for x, _ in curves if len(x))
+        steps = [np.median(np.diff(x)) for x, _ in curves if len(x) > 1]
+        step = min(step for step in steps if step > 0) if any(step > 0 for step in steps) else 1.0
+        points = min(int(round((high - low) / step)) + 1, max_points)
+        grid = np.linspace(low, high, max(points, 2))
+
+        intensities = np.full((len(curves), len(grid)), np.nan)
+        for row, (x, y) in enumerate(curves):
+            if len(x) > 1:
+                intensities[row] = np.interp(grid, x, y, left=np.nan, right=np.nan)
+        return cls(grid, intensities, labels, colors, sources)
+
+    def __len__(self):
+        return len(self.intensities)
+
+    def _replace(self, x=None, intensities=None):
+        return SpectrumStack(self.x if x is None else x, self.intensities if intensities is None else intensities,
+                             self.labels, self.colors, self.sources)
+
+    def select(self, rows):
+        """Stack of the given rows (indices or a boolean mask), metadata included."""
+        rows = np.arange(len(self))[rows]
+        return SpectrumStack(self.x, self.intensities[rows], [self.labels[i] for i in rows],
+                             [self.colors[i] for i in rows], [self.sources[i] for i in rows])
+
+    def has_data(self):
+        """Boolean mask of the spectra with at least one finite point."""
+        return np.isfinite(self.intensities).any(axis=1)
+
+    def window(self, xmin=None, xmax=None):
+        """Keep the columns with xmin <= x <= xmax (either bound may be None)."""
+        start = 0 if xmin is None else int(np.searchsorted(self.x, xmin, side="left"))
+        stop = len(self.x) if xmax is None else int(np.searchsorted(self.x, xmax, side="right"))
+        return self._replace(self.x[start:stop], self.intensities[:, start:stop])
+
+    def _map_blocks(self, func):
+        # Apply func to groups of rows that cover the same columns, so NaN edges never enter it
+        result = np.full_like(self.intensities, np.nan)
+        if result.size == 0:
+            return self._replace(intensities=result)
+        finite = np.isfinite(self.intensities)
+        has_data = self.has_data()
+        starts = np.where(has_data, finite.argmax(axis=1), 0)
+        stops = np.where(has_data, len(self.x) - finite[:, ::-1].argmax(axis=1), 0)
+        spans = {}
+        for row in np.flatnonzero(has_data):
+            spans.setdefault((starts[row], stops[row]), []).append(row)
+        for (start, stop), rows in spans.items():
+            result[rows, start:stop] = func(self.intensities[rows, start:stop])
+        return self._replace(intensities=result)
+
+    def baseline_corrected(self, lam=1e5, p=0.01, niter=10):
+        """ALS baseline correction of all spectra in one batched banded solve per span."""
+        return self._map_blocks(lambda block: als_baseline_correction_batch(block, lam, p, niter))
+
+    def smoothed(self, window_length, polyorder):
+        """Savitzky-Golay smoothing of all spectra along the x axis."""
+        return self._map_blocks(lambda block: _savgol_rows(block, window_length, polyorder))
+
+    def normalized(self, mode="max"):
+        """Scale every spectrum to its maximum ("max"), to 0..1 ("minmax") or to unit area ("area")."""
+        if mode not in ("max", "minmax", "area"):
+            raise ValueError(f"Unknown normalization mode: {mode}")
+        if self.intensities.size == 0:
+            return self._replace()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if mode == "max":
+                scaled = self.intensities / np.nanmax(self.intensities, axis=1, keepdims=True)
+            elif mode == "minmax":
+                low = np.nanmin(self.intensities, axis=1, keepdims=True)
+                high = np.nanmax(self.intensities, axis=1, keepdims=True)
+                scaled = (self.intensities - low) / (high - low)
+            else:
+                filled = np.nan_to_num(self.intensities)
+                area = np.abs(np.sum((filled[:, 1:] + filled[:, :-1]) * np.diff(self.x), axis=1, keepdims=True) / 2)
+                scaled = self.intensities / area
+        return self._replace(intensities=scaled)
+
+    def offset(self, step, start=0.0):
+        """Shift spectrum i up by start + i * step (for stacked "separate" plots)."""
+        shifts = start + step * np.arange(len(self))
+        return self._replace(intensities=self.intensities + shifts[:, np.newaxis])
+
+    def to_frame(self, x_name="x"):
+        """Wide table: the x axis followed by one column per spectrum label."""
+        return pd.DataFrame(np.column_stack((self.x, self.intensities.T)), columns=[x_name] + list(self.labels))
+
+    def export(self, filename, x_name="x"):
+        self.to_frame(x_name).to_csv(filename, index=False)
+
+    def plot(self, ax, linewidth=1.5, legend_labels=True, **kwargs):
+        """Draw all spectra on ax as one LineCollection; return it and per-spectrum legend handles."""
+        from matplotlib.collections import LineCollection
+        from matplotlib.lines import Line2D
+
+        segments = np.empty((len(self), len(self.x), 2))
+        segments[:, :, 0] = self.x
+        segments[:, :, 1] = self.intensities
+        colors = [color if color is not None else f"C{i % 10}" for i, color in enumerate(self.colors)]
+        collection = LineCollection(segments, colors=colors, linewidths=linewidth, **kwargs)
+        ax.add_collection(collection)
+        ax.autoscale_view()
+
+        handles = []
+        if legend_labels:
+            handles = [Line2D([], [], color=color, linewidth=linewidth, label=label)
+                       for color, label in zip(colors, self.labels)]
+        return collection, handles
+
+
+def _savgol_rows(block, window_length, polyorder):
+    # Same checks as apply_savgol_filter, then one filter call over every row
+    if window_length % 2 == 0:
+        window_length += 1
+    if window_length <= polyorder:
+        raise ValueError("Window length must be greater than polynomial order.")
+    if window_length > block.shape[1]:
+        raise ValueError(f"Window length ({window_length}) is larger than data length ({block.shape[1]}).")
+    from scipy.signal import savgol_filter
+    return savgol_filter(block, window_length=window_length, polyorder=polyorder, axis=1)
+
+
+# Shared cache for XRD scans, used by the plotter and the batch tools
+xrd_cache = SpectrumCache(parse_xrd_file)
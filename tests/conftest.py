@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The tools are scripts next to their library modules, not an installed package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "Device Specific Scripts")]
+os.environ.setdefault("MPLBACKEND", "Agg")
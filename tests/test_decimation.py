@@ -0,0 +1,15 @@
+import numpy as np
+
+from decimation import MinMaxPyramid
+
+
+def test_pyramid_view_keeps_extremes():
+    y = np.random.default_rng(0).integers(-1000, 1000, 2_000_000).astype(np.int32)
+    y[123457] = 5000
+    pyramid = MinMaxPyramid(y, chunk_size=100_000)
+    assert all(values.dtype == np.int32 for _, _, values in pyramid.levels)
+    for start, stop in [(0, len(y)), (100_000, 200_000), (120_000, 130_000), (123_000, 124_000)]:
+        index, values = pyramid.view(start, stop, pixels=2000)
+        assert np.all(np.diff(index) >= 0)
+        assert values.max() == y[start:stop].max() and values.min() == y[start:stop].min()
+        assert len(index) <= 16 * 2000
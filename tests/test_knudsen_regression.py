@@ -0,0 +1,16 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from knudsen_regression import slope_tables
+
+
+def test_slope_tables_keyed_by_given_folder(tmp_path):
+    time = np.arange(2000, dtype=np.float64)
+    pd.DataFrame({"Time(seconds)": time, "CHANNEL0_Pa": np.full_like(time, 2e5),
+                  "CHANNEL1_Pa": 100 + 2.0 * time}).to_csv(tmp_path / "run.csv", index=False)
+    folder = str(tmp_path) + os.sep
+    tables = slope_tables([folder], workers=1)
+    assert list(tables) == [folder]
+    assert tables[folder]["slope"].tolist() == [2.0]
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+pytest.importorskip("rdkit")
+
+import molecules
+
+VALID_RECORD = """
+     RDKit          2D
+
+  1  0  0  0  0  0  0  0  0  0999 V2000
+    0.0000    0.0000    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0
+M  END
+$$$$
+"""
+INVALID_RECORD = """
+     RDKit          2D
+
+not a molecule
+M  END
+$$$$
+"""
+
+
+def test_unnamed_invalid_sdf_record_is_reported(tmp_path, capsys):
+    sdf = tmp_path / "library.sdf"
+    sdf.write_text(VALID_RECORD + INVALID_RECORD)
+    out = tmp_path / "out"
+    status = molecules.main([str(sdf), "--out", str(out), "--cache", str(tmp_path / "cache"), "--workers", "1"])
+    assert status == 0
+    assert "Error rendering 'record 2'" in capsys.readouterr().out
+    assert os.path.exists(out / "molecules.csv")
@@ -0,0 +1,24 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+from spectra import SpectrumStack
+
+
+def test_empty_stack():
+    stack = SpectrumStack.from_curves([])
+    assert len(stack) == 0
+    assert stack.intensities.shape == (0, 0)
+    stack = stack.window(0, 10).baseline_corrected().normalized().offset(1.0)
+    assert len(stack.select(stack.has_data())) == 0
+    fig, ax = plt.subplots()
+    _, handles = stack.plot(ax)
+    plt.close(fig)
+    assert handles == []
+
+
+def test_window_without_points_keeps_spectra():
+    x = np.arange(10.0)
+    stack = SpectrumStack.from_curves([(x, x), (x, np.ones(10))], labels=["a", "b"]).window(20, 30)
+    assert stack.intensities.shape == (2, 0)
+    assert stack.labels == ["a", "b"]
+    assert not stack.has_data().any()
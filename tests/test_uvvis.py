@@ -0,0 +1,10 @@
+import pytest
+
+from uvvis import Calibration
+
+
+def test_calibration_without_usable_files(tmp_path):
+    path = tmp_path / "blank.csv"
+    path.write_text("no title line\n")
+    with pytest.raises(ValueError, match="No usable calibration files"):
+        Calibration.from_files([str(path)])
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from spectra import SpectrumCache
+
+TIME = "Time"
+WEIGHT = "Unsubtracted Weight"
+TEMPERATURE = "Program Temperature"
+
+
+def load_tga_csv(file_path):
+    """Read the time, weight and program temperature columns of a TA CSV export.
+
+    Only the three needed columns are parsed, straight into float64 with the C
+    engine. Files without a Time header give an empty table; rows that are too
+    short for the three columns are skipped.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    if TIME not in header:
+        return pd.DataFrame({TIME: [], WEIGHT: [], TEMPERATURE: []}, dtype=np.float64)
+    data = pd.read_csv(file_path, usecols=[TIME, WEIGHT, TEMPERATURE], dtype=np.float64,
+                       float_precision="round_trip", engine="c")
+    return data[[TIME, WEIGHT, TEMPERATURE]].dropna()
+
+
+# Parsed runs stay in memory between plots and are re-read only when the file changes
+tga_cache = SpectrumCache(load_tga_csv)
+
+
+def start_index(temperature, start_temperature=100.0):
+    """Index of the first point at or above start_temperature, or None.
+
+    The running maximum of the temperature is sorted even if the program
+    contains holds or cooling segments, so searchsorted finds the same point as
+    a scan for the first temperature >= start_temperature.
+    """
+    if len(temperature) == 0:
+        return None
+    index = int(np.searchsorted(np.maximum.accumulate(temperature), start_temperature, side="left"))
+    return index if index < len(temperature) else None
+
+
+def normalize_weight(weight, start=0):
+    """Weight in % of the weight at index start, from start onwards."""
+    return weight[start:] / weight[start] * 100
+
+
+def mass_loss(weight, start=0):
+    """Weight lost (%) between index start and the end of the run."""
+    return (1 - weight[-1] / weight[start]) * 100
+
+
+def resample_runs(runs, step=1.0, start_temperature=None):
+    """Put the normalized weight of several runs on one temperature grid.
+
+    runs is a list of (temperature, weight) arrays. Each run is normalized at
+    start_temperature (or its first point) and interpolated along its heating
+    ramp; grid points outside a run's temperature range are NaN. Returns the
+    grid and a (runs x grid) matrix.
+    """
+    curves = []
+    for temperature, weight in runs:
+        start = 0 if start_temperature is None else start_index(temperature, start_temperature)
+        if start is None:
+            curves.append(None)
+            continue
+        # Keep the heating ramp only: points where the temperature reaches a new maximum
+        ramp = temperature[start:]
+        heating = np.concatenate(([True], ramp[1:] > np.maximum.accumulate(ramp)[:-1]))
+        curves.append((ramp[heating], normalize_weight(weight, start)[heating]))
+
+    valid = [curve for curve in curves if curve is not None and len(curve[0]) > 1]
+    if not valid:
+        return np.empty(0), np.full((len(runs), 0), np.nan)
+    low = min(curve[0][0] for curve in valid)
+    high = max(curve[0][-1] for curve in valid)
+    grid = np.arange(low, high + step / 2, step)
+
+    matrix = np.full((len(runs), len(grid)), np.nan)
+    for row, curve in enumerate(curves):
+        if curve is not None and len(curve[0]) > 1:
+            matrix[row] = np.interp(grid, curve[0], curve[1], left=np.nan, right=np.nan)
+    return grid, matrix
+
+
+def dtg(grid, matrix, window=11, polyorder=2):
+    """Derivative of the normalized weight (%/°C) of every run, smoothed with Savitzky-Golay.
+
+    All runs are differentiated in one call along the temperature axis. Points
+    within window/2 of a run's NaN edges become NaN as well.
+    """
+    if window % 2 == 0:
+        window += 1
+    if matrix.shape[1] < window:
+        return np.full(matrix.shape, np.nan)
+    step = grid[1] - grid[0]
+    from scipy.signal import savgol_filter
+    return savgol_filter(matrix, window, polyorder, deriv=1, delta=step, axis=1, mode="nearest")
+
+
+def onset_temperatures(grid, matrix, derivative):
+    """Extrapolated onset temperature of the main mass-loss step of every run.
+
+    The onset is where the tangent at the steepest point (minimum of the DTG)
+    crosses the level of the run's first point. Runs without a mass loss get NaN.
+    """
+    n_runs = matrix.shape[0]
+    onsets = np.full(n_runs, np.nan)
+    has_slope = np.isfinite(derivative).any(axis=1)
+    if not has_slope.any():
+        return onsets
+
+    rows = np.flatnonzero(has_slope)
+    steepest = np.nanargmin(derivative[rows], axis=1)
+    slope = derivative[rows, steepest]
+    first_valid = np.argmax(np.isfinite(matrix[rows]), axis=1)
+    baseline = matrix[rows, first_valid]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        onset = grid[steepest] + (baseline - matrix[rows, steepest]) / slope
+    onsets[rows] = np.where(slope < 0, onset, np.nan)
+    return onsets
@@ -0,0 +1,269 @@
+"""UV-Vis exports (semicolon-separated, decimal comma) and Beer-Lambert calibration.
+
+A calibration series is a folder of spectra whose TITLE line holds the
+concentration. All spectra of a series are stacked into one concentration x
+wavelength absorbance matrix and a straight line is fitted at every
+wavelength at once. Screen many series in parallel without the GUI:
+
+    python uvvis.py series_A series_B --out calibration
+"""
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from spectra import SpectrumStack
+
+HEADER_LINES = 19  # Lines before the numeric block in the instrument export
+CONCENTRATION_PATTERN = re.compile(r'\d+')
+
+
+def _is_data_line(line):
+    """Return True if line is a "wavelength;absorbance" row the line parser accepts."""
+    parts = line.strip().split(';')
+    if len(parts) != 2:
+        return False
+    try:
+        float(parts[0].replace(',', '.'))
+        float(parts[1].replace(',', '.'))
+    except ValueError:
+        return False
+    return True
+
+
+def read_uvvis_file(file_path):
+    """Read Wavelength/Absorbance of a UV-Vis export; the TITLE concentration goes to attrs.
+
+    The header is scanned line by line up to the first numeric row, then the
+    whole block is parsed by the pandas C engine with decimal=",". Blocks that
+    are not a clean two-column table fall back to the line parser, so the
+    result is always the same as parsing row by row.
+    """
+    concentration = None
+    with open(file_path, 'r', encoding='latin1') as file:
+        # The numeric block starts at line 20 at the earliest
+        for _ in range(HEADER_LINES):
+            line = file.readline()
+            if concentration is None and line.startswith('TITLE'):
+                concentration = float(CONCENTRATION_PATTERN.findall(line)[0])
+
+        data_start = file.tell()
+        line = file.readline()
+        while line and not _is_data_line(line):
+            if concentration is None and line.startswith('TITLE'):
+                concentration = float(CONCENTRATION_PATTERN.findall(line)[0])
+            data_start = file.tell()
+            line = file.readline()
+
+        block = None
+        if line:
+            file.seek(data_start)
+            try:
+                block = pd.read_csv(file, sep=';', decimal=',', header=None, dtype=np.float64,
+                                    float_precision="round_trip", engine="c")
+            except (ValueError, pd.errors.ParserError):
+                block = None
+
+    if block is not None and block.shape[1] == 2 and not block.isna().any().any():
+        data = pd.DataFrame({"Wavelength": block[0].to_numpy(), "Absorbance": block[1].to_numpy()})
+    else:
+        data = _read_data_lines(file_path, data_start)
+    data.attrs["concentration"] = concentration
+    return data
+
+
+def _read_data_lines(file_path, data_start):
+    """Row-by-row parser of the numeric block, starting at file position data_start."""
+    wavelengths, absorbances = [], []
+    with open(file_path, 'r', encoding='latin1') as file:
+        file.seek(data_start)
+        for line in file:
+            parts = line.strip().split(';')
+            if len(parts) == 2:
+                try:
+                    wavelength = float(parts[0].replace(',', '.'))
+                    absorbance = float(parts[1].replace(',', '.'))
+                except ValueError:
+                    # Skip lines that cannot be converted to float
+                    continue
+                wavelengths.append(wavelength)
+                absorbances.append(absorbance)
+    return pd.DataFrame({"Wavelength": np.array(wavelengths, dtype=np.float64),
+                         "Absorbance": np.array(absorbances, dtype=np.float64)})
+
+
+def fit_lines(x, Y):
+    """Least-squares line y = slope * x + intercept for every column of Y at once.
+
+    NaN entries of Y are left out of the fit of their column. Returns slope,
+    intercept, correlation coefficient r and the number of points per column.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64).reshape(len(x), -1)
+    valid = np.isfinite(Y)
+    weights = valid.astype(np.float64)
+    Yv = np.where(valid, Y, 0.0)
+
+    n = weights.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = (weights * x[:, np.newaxis]).sum(axis=0) / n
+        y_mean = Yv.sum(axis=0) / n
+        dx = np.where(valid, x[:, np.newaxis] - x_mean, 0.0)
+        dy = np.where(valid, Yv - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+
+        fitted = (n >= 2) & (sxx > 0)
+        slope = np.where(fitted, sxy / sxx, np.nan)
+        intercept = y_mean - slope * x_mean
+        r = np.where(fitted & (syy > 0), sxy / np.sqrt(sxx * syy), np.nan)
+    return slope, intercept, r, n.astype(np.intp)
+
+
+class Calibration:
+    """A calibration series: concentrations and their spectra on one wavelength axis.
+
+    absorbance is a (spectra x wavelengths) float64 matrix, NaN where a
+    spectrum does not cover a wavelength. peak_absorbances are the maxima of
+    the spectra as measured, before any interpolation onto the common axis.
+    """
+
+    def __init__(self, concentrations, stack, peak_absorbances=None):
+        self.concentrations = np.asarray(concentrations, dtype=np.float64)
+        self.stack = stack
+        if peak_absorbances is None:
+            peak_absorbances = np.nanmax(stack.intensities, axis=1) if stack.intensities.size else []
+        self.peak_absorbances = np.asarray(peak_absorbances, dtype=np.float64)
+
+    @classmethod
+    def from_files(cls, file_paths):
+        """Read a series; files without a TITLE concentration or data are skipped with a message.
+
+        Raises ValueError if fewer than two usable files remain, since no line can be fitted.
+        """
+        concentrations, curves, sources, peaks = [], [], [], []
+        for file_path in file_paths:
+            data = read_uvvis_file(file_path)
+            concentration = data.attrs["concentration"]
+            if concentration is None or data.empty:
+                print(f"Skipping {file_path}: no concentration or no data")
+                continue
+            concentrations.append(concentration)
+            curves.append((data["Wavelength"].to_numpy(), data["Absorbance"].to_numpy()))
+            sources.append(file_path)
+            peaks.append(data["Absorbance"].max())
+        if len(concentrations) < 2:
+            raise ValueError(f"No usable calibration files: {len(concentrations)} of {len(file_paths)} "
+                             "have a TITLE concentration and data, at least 2 are needed")
+        labels = [os.path.basename(path) for path in sources]
+        return cls(concentrations, SpectrumStack.from_curves(curves, labels, sources=sources), peaks)
+
+    @property
+    def wavelengths(self):
+        return self.stack.x
+
+    @property
+    def absorbance(self):
+        return self.stack.intensities
+
+    def fit_max(self):
+        """Slope, intercept and r of the maximum absorbance against concentration."""
+        slope, intercept, r, _ = fit_lines(self.concentrations, self.peak_absorbances)
+        return float(slope[0]), float(intercept[0]), float(r[0])
+
+    def fit_wavelengths(self):
+        """Beer-Lambert fit at every wavelength as a table (one row per wavelength)."""
+        slope, intercept, r, n = fit_lines(self.concentrations, self.absorbance)
+        return pd.DataFrame({
+            "wavelength": self.wavelengths,
+            "slope": slope,
+            "intercept": intercept,
+            "r": r,
+            "r_squared": r * r,
+            "points": n,
+        })
+
+    def best_wavelength(self, min_points=3):
+        """Row of fit_wavelengths() with the highest R² among wavelengths covered by min_points spectra."""
+        fits = self.fit_wavelengths()
+        candidates = fits[(fits["points"] >= min_points) & fits["r_squared"].notna()]
+        if candidates.empty:
+            return None
+        return candidates.loc[candidates["r_squared"].idxmax()]
+
+
+def find_spectra(folder):
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.lower().endswith('.csv'))
+
+
+def calibrate_folder(folder):
+    """Per-wavelength fits and a one-row summary of one calibration series."""
+    calibration = Calibration.from_files(find_spectra(folder))
+    fits = calibration.fit_wavelengths()
+    slope, intercept, r = calibration.fit_max()
+    best = calibration.best_wavelength()
+    summary = {
+        "series": os.path.basename(folder),
+        "spectra": len(calibration.concentrations),
+        "max_slope": slope,
+        "max_intercept": intercept,
+        "max_r": r,
+        "best_wavelength": np.nan if best is None else best["wavelength"],
+        "best_slope": np.nan if best is None else best["slope"],
+        "best_r_squared": np.nan if best is None else best["r_squared"],
+    }
+    return fits, summary
+
+
+def _calibrate_job(folder):
+    # Worker entry point: report errors instead of raising, so one bad series does not stop the screen
+    try:
+        return folder, calibrate_folder(folder), None
+    except Exception as e:
+        return folder, None, str(e)
+
+
+def screen_series(folders, workers=None):
+    """Calibrate many series on a process pool; returns {folder: fits}, the summary table and failures."""
+    fits, summaries, failures = {}, [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for folder, result, error in executor.map(_calibrate_job, folders):
+            if error is not None:
+                failures.append((folder, error))
+                continue
+            fits[folder], summary = result
+            summaries.append(summary)
+    return fits, pd.DataFrame(summaries), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit UV-Vis calibration series at every wavelength without the GUI.")
+    parser.add_argument("folders", nargs="+", help="one folder of UV-Vis CSV exports per calibration series")
+    parser.add_argument("--out", default="uvvis_calibration", help="output folder (default: uvvis_calibration)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    folders = [os.path.normpath(folder) for folder in args.folders]
+    fits, summary, failures = screen_series(folders, args.workers)
+    for folder, error in failures:
+        print(f"Error processing {folder}: {error}")
+    if summary.empty:
+        return 1
+
+    os.makedirs(args.out, exist_ok=True)
+    for folder, table in fits.items():
+        table.to_csv(os.path.join(args.out, f"{os.path.basename(folder)}_calibration.csv"), index=False)
+    summary_path = os.path.join(args.out, "summary.csv")
+    summary.to_csv(summary_path, index=False)
+    print(summary.to_string(index=False))
+    print(f"Per-wavelength fits and summary saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())